@@ -1,5 +1,7 @@
 from django.db import models
+from django.db.models import Case, F, Value, When
 from django.conf import settings
+from django.utils import timezone
 
 
 class Account(models.Model):
@@ -37,4 +39,24 @@ class Account(models.Model):
     
     def __str__(self):
         return f"{self.name} ({self.get_account_type_display()})"
+    
+    @classmethod
+    def apply_balance_deltas(cls, deltas):
+        """
+        Suma a cada saldo su delta ({account_id: monto}) en una sola sentencia
+        UPDATE con F(), sin leer ni reescribir la fila completa.
+        """
+        deltas = {account_id: amount for account_id, amount in deltas.items() if account_id and amount}
+        if not deltas:
+            return 0
+        
+        delta = Case(
+            *[When(pk=account_id, then=Value(amount)) for account_id, amount in deltas.items()],
+            default=Value(0),
+            output_field=models.DecimalField(max_digits=15, decimal_places=2)
+        )
+        return cls.objects.filter(pk__in=deltas.keys()).update(
+            balance=F('balance') + delta,
+            updated_at=timezone.now()
+        )
 
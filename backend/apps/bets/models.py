@@ -87,103 +87,36 @@ class Bet(models.Model):
     def is_winning(self):
         return self.result == 'ganó'
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        from .settlement import TRACKED_FIELDS, snapshot
+        instance = super().from_db(db, field_names, values)
+        # Estado cargado, para saber qué cambió al guardar sin volver a consultar
+        if set(TRACKED_FIELDS) <= set(field_names):
+            instance._loaded_state = snapshot(instance)
+        return instance
+    
     def save(self, *args, **kwargs):
+        from .settlement import settle_bet, snapshot
         is_new = self.pk is None
-        old_instance = None
-        
-        if not is_new:
-            try:
-                old_instance = Bet.objects.get(pk=self.pk)
-            except Bet.DoesNotExist:
-                old_instance = None
+        previous = getattr(self, '_loaded_state', None)
         
         super().save(*args, **kwargs)
         
-        if is_new:
-            # No llamamos _apply_bet() porque las transacciones automáticas ya modifican el saldo
-            self._create_transactions()
-        elif old_instance:
-            # Revertir transacciones antiguas (esto también revierte el saldo)
-            self._update_transactions(old_instance)
+        # Solo toca la transacción asociada (y el saldo) si cambió algo relevante
+        settle_bet(self, previous=previous, created=is_new)
+        self._loaded_state = snapshot(self)
+        self._invalidate_statistics()
     
     def delete(self, *args, **kwargs):
-        # Eliminar transacciones (esto también revierte el saldo automáticamente)
-        self._delete_transactions()
-        super().delete(*args, **kwargs)
-    
-    def _apply_bet(self):
-        if self.result == 'ganó':
-            self.account.balance -= self.bet_amount
-            self.account.balance += self.payout_amount
-        elif self.result == 'perdió':
-            self.account.balance -= self.bet_amount
-        elif self.result == 'pendiente':
-            self.account.balance -= self.bet_amount
-        self.account.save()
-    
-    def _reverse_bet(self, instance):
-        if instance.result == 'ganó':
-            instance.account.balance += instance.bet_amount
-            instance.account.balance -= instance.payout_amount
-        elif instance.result == 'perdió':
-            instance.account.balance += instance.bet_amount
-        elif instance.result == 'pendiente':
-            instance.account.balance += instance.bet_amount
-        instance.account.save()
-    
-    def _create_transactions(self):
-        from apps.transactions.models import Transaction
-        
-        if self.result == 'ganó':
-            # Si ganó, solo crear una transacción de ingreso con la ganancia neta
-            # Ganancia neta = monto ganado - monto apostado
-            net_profit = self.payout_amount - self.bet_amount
-            Transaction.objects.create(
-                user=self.user,
-                transaction_type='ingreso',
-                amount=net_profit,
-                description=f"Ganancia de apuesta: {self.event_name}",
-                date=self.date,
-                account=self.account,
-                related_bet=self,
-                notes=f"Ganancia neta de apuesta {self.get_bet_type_display()} (Ganado: {self.payout_amount} - Apostado: {self.bet_amount})"
-            )
-        elif self.result == 'perdió':
-            # Si perdió, crear transacción de gasto (monto apostado)
-            Transaction.objects.create(
-                user=self.user,
-                transaction_type='gasto',
-                amount=self.bet_amount,
-                description=f"Apuesta perdida: {self.event_name}",
-                date=self.date,
-                account=self.account,
-                related_bet=self,
-                notes=f"Apuesta {self.get_bet_type_display()}" + (f" - {self.get_sport_type_display()}" if self.sport_type else "")
-            )
-        elif self.result == 'pendiente':
-            # Si está pendiente, crear transacción de gasto (monto apostado)
-            # Cuando se resuelva, se actualizará automáticamente
-            Transaction.objects.create(
-                user=self.user,
-                transaction_type='gasto',
-                amount=self.bet_amount,
-                description=f"Apuesta pendiente: {self.event_name}",
-                date=self.date,
-                account=self.account,
-                related_bet=self,
-                notes=f"Apuesta {self.get_bet_type_display()}" + (f" - {self.get_sport_type_display()}" if self.sport_type else "")
-            )
-    
-    def _update_transactions(self, old_instance):
-        from apps.transactions.models import Transaction
-        
-        # Eliminar transacciones antiguas relacionadas
-        Transaction.objects.filter(related_bet=self).delete()
-        
-        # Crear nuevas transacciones según el resultado actual
-        self._create_transactions()
+        from .settlement import unsettle_bet
+        # Eliminar transacciones revirtiendo su efecto en el saldo
+        unsettle_bet(self)
+        result = super().delete(*args, **kwargs)
+        self._invalidate_statistics()
+        return result
     
-    def _delete_transactions(self):
-        from apps.transactions.models import Transaction
-        Transaction.objects.filter(related_bet=self).delete()
+    def _invalidate_statistics(self):
+        from .statistics import invalidate_statistics
+        invalidate_statistics(self.user_id)
 
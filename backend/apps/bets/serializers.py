@@ -63,6 +63,27 @@ class BetListSerializer(serializers.ModelSerializer):
         ]
 
 
+class BetSettlementSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    result = serializers.ChoiceField(choices=[('ganó', 'Ganó'), ('perdió', 'Perdió')])
+    payout_amount = serializers.DecimalField(max_digits=15, decimal_places=2, required=False, default=0)
+    
+    def validate(self, attrs):
+        payout_amount = attrs.get('payout_amount') or 0
+        
+        if attrs['result'] == 'ganó' and payout_amount <= 0:
+            raise serializers.ValidationError({
+                'payout_amount': 'El monto ganado es requerido y debe ser mayor a 0 cuando el resultado es "ganó".'
+            })
+        
+        if attrs['result'] != 'ganó' and payout_amount > 0:
+            raise serializers.ValidationError({
+                'payout_amount': 'El monto ganado solo puede ser mayor a 0 cuando el resultado es "ganó".'
+            })
+        
+        return attrs
+
+
 
 
 
@@ -0,0 +1,185 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from apps.accounts.models import Account
+
+# Campos de la apuesta que se reflejan en su transacción
+BALANCE_FIELDS = ('result', 'bet_amount', 'payout_amount', 'account_id')
+DESCRIPTIVE_FIELDS = ('event_name', 'bet_type', 'sport_type', 'date')
+TRACKED_FIELDS = BALANCE_FIELDS + DESCRIPTIVE_FIELDS
+
+TRANSACTION_FIELDS = ['transaction_type', 'amount', 'description', 'notes', 'date', 'account', 'updated_at']
+
+
+def snapshot(bet):
+    return {field: getattr(bet, field) for field in TRACKED_FIELDS}
+
+
+def balance_effect(transaction_type, amount):
+    if transaction_type == 'ingreso':
+        return amount
+    if transaction_type == 'gasto':
+        return -amount
+    return Decimal('0')
+
+
+def transaction_fields(bet):
+    """Campos de la transacción que representa el estado actual de la apuesta."""
+    sport = f" - {bet.get_sport_type_display()}" if bet.sport_type else ""
+    
+    if bet.result == 'ganó':
+        # Si ganó, una transacción de ingreso con la ganancia neta (ganado - apostado)
+        fields = {
+            'transaction_type': 'ingreso',
+            'amount': bet.payout_amount - bet.bet_amount,
+            'description': f"Ganancia de apuesta: {bet.event_name}",
+            'notes': f"Ganancia neta de apuesta {bet.get_bet_type_display()} (Ganado: {bet.payout_amount} - Apostado: {bet.bet_amount})",
+        }
+    elif bet.result == 'perdió':
+        fields = {
+            'transaction_type': 'gasto',
+            'amount': bet.bet_amount,
+            'description': f"Apuesta perdida: {bet.event_name}",
+            'notes': f"Apuesta {bet.get_bet_type_display()}{sport}",
+        }
+    else:
+        # Pendiente: el monto apostado ya salió de la cuenta
+        fields = {
+            'transaction_type': 'gasto',
+            'amount': bet.bet_amount,
+            'description': f"Apuesta pendiente: {bet.event_name}",
+            'notes': f"Apuesta {bet.get_bet_type_display()}{sport}",
+        }
+    
+    fields['date'] = bet.date
+    fields['account_id'] = bet.account_id
+    return fields
+
+
+def _plan(bets, linked_by_bet):
+    """
+    Calcula los cambios necesarios para que cada apuesta tenga exactamente una
+    transacción acorde a su estado, y el delta de saldo neto por cuenta.
+    """
+    from apps.transactions.models import Transaction
+    
+    now = timezone.now()
+    deltas = defaultdict(Decimal)
+    to_update = []
+    to_create = []
+    to_delete = []
+    
+    for bet in bets:
+        fields = transaction_fields(bet)
+        linked = linked_by_bet.get(bet.pk, [])
+        
+        for tx in linked:
+            deltas[tx.account_id] -= balance_effect(tx.transaction_type, tx.amount)
+        deltas[bet.account_id] += balance_effect(fields['transaction_type'], fields['amount'])
+        
+        if linked:
+            tx = linked[0]
+            for field, value in fields.items():
+                setattr(tx, field, value)
+            tx.updated_at = now
+            to_update.append(tx)
+            to_delete.extend(t.pk for t in linked[1:])
+        else:
+            to_create.append(Transaction(user_id=bet.user_id, related_bet=bet, **fields))
+    
+    return to_update, to_create, to_delete, deltas
+
+
+def _apply(to_update, to_create, to_delete, deltas):
+    from apps.transactions.models import Transaction
+    
+    # Las escrituras van directo a la tabla: el saldo se ajusta una sola vez con el delta neto
+    if to_delete:
+        Transaction.objects.filter(pk__in=to_delete).delete()
+    if to_update:
+        Transaction.objects.bulk_update(to_update, TRANSACTION_FIELDS)
+    if to_create:
+        from apps.performance.metrics import transactions_written
+        Transaction.objects.bulk_create(to_create)
+        transactions_written.inc(len(to_create))
+    Account.apply_balance_deltas(deltas)
+
+
+def _linked_transactions(bet_ids):
+    from apps.transactions.models import Transaction
+    
+    linked_by_bet = defaultdict(list)
+    linked = Transaction.objects.filter(related_bet_id__in=bet_ids).only(
+        'id', 'related_bet_id', 'transaction_type', 'amount', 'account_id'
+    ).order_by('id')
+    for tx in linked:
+        linked_by_bet[tx.related_bet_id].append(tx)
+    return linked_by_bet
+
+
+def settle_bet(bet, previous=None, created=False):
+    """
+    Sincroniza la transacción de una apuesta tras guardarla.
+    
+    ``previous`` es el snapshot del estado cargado desde la base de datos. Si
+    ningún campo relevante cambió no se escribe nada; si solo cambiaron campos
+    descriptivos, la transacción se actualiza sin tocar el saldo.
+    """
+    if previous is not None and not created:
+        changed = {field for field, value in previous.items() if getattr(bet, field) != value}
+        if not changed:
+            return
+    
+    with db_transaction.atomic():
+        linked_by_bet = {} if created else _linked_transactions([bet.pk])
+        _apply(*_plan([bet], linked_by_bet))
+
+
+def unsettle_bet(bet):
+    """Elimina las transacciones de la apuesta revirtiendo su efecto en el saldo."""
+    from apps.transactions.models import Transaction
+    
+    with db_transaction.atomic():
+        linked = _linked_transactions([bet.pk]).get(bet.pk, [])
+        deltas = defaultdict(Decimal)
+        for tx in linked:
+            deltas[tx.account_id] -= balance_effect(tx.transaction_type, tx.amount)
+        if linked:
+            Transaction.objects.filter(pk__in=[tx.pk for tx in linked]).delete()
+        Account.apply_balance_deltas(deltas)
+
+
+def settle_pending_bets(user, settlements):
+    """
+    Resuelve muchas apuestas pendientes en una sola transacción de base de datos.
+    
+    ``settlements`` es una lista de dicts con ``id``, ``result`` y
+    ``payout_amount``. Devuelve (apuestas resueltas, ids omitidos).
+    """
+    from .models import Bet
+    from .statistics import invalidate_statistics
+    
+    by_id = {item['id']: item for item in settlements}
+    
+    with db_transaction.atomic():
+        bets = list(
+            Bet.objects.select_for_update().filter(user=user, result='pendiente', pk__in=by_id.keys())
+        )
+        now = timezone.now()
+        for bet in bets:
+            bet.result = by_id[bet.pk]['result']
+            bet.payout_amount = by_id[bet.pk].get('payout_amount') or Decimal('0')
+            bet.updated_at = now
+        
+        if bets:
+            Bet.objects.bulk_update(bets, ['result', 'payout_amount', 'updated_at'])
+            _apply(*_plan(bets, _linked_transactions([bet.pk for bet in bets])))
+    
+    invalidate_statistics(user.id)
+    
+    settled_ids = {bet.pk for bet in bets}
+    skipped = [bet_id for bet_id in by_id if bet_id not in settled_ids]
+    return bets, skipped
@@ -0,0 +1,204 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Avg, Case, Count, DecimalField, F, FloatField, Q, Sum, Value, When, Window
+from django.db.models.functions import RowNumber
+from django.db.models.expressions import RowRange
+
+from .models import Bet
+
+CACHE_TIMEOUT = 60 * 60
+ROLLING_WINDOW = 10
+
+WON = 'ganó'
+LOST = 'perdió'
+PENDING = 'pendiente'
+
+
+def statistics_cache_key(user_id):
+    return f'bets:statistics:{user_id}'
+
+
+def invalidate_statistics(user_id):
+    cache.delete(statistics_cache_key(user_id))
+
+
+def _totals(queryset):
+    """Todos los totales y desgloses en una sola consulta con agregación condicional."""
+    aggregates = {
+        'total_bet': Sum('bet_amount'),
+        'total_won': Sum('payout_amount', filter=Q(result=WON)),
+        'total_lost': Sum('bet_amount', filter=Q(result=LOST)),
+        'total_bets': Count('id'),
+        'won_count': Count('id', filter=Q(result=WON)),
+        'lost_count': Count('id', filter=Q(result=LOST)),
+        'pending_count': Count('id', filter=Q(result=PENDING)),
+    }
+    for bet_type, _ in Bet.BET_TYPES:
+        aggregates[f'type_{bet_type}_bet'] = Sum('bet_amount', filter=Q(bet_type=bet_type))
+        aggregates[f'type_{bet_type}_won'] = Sum('payout_amount', filter=Q(bet_type=bet_type, result=WON))
+        aggregates[f'type_{bet_type}_count'] = Count('id', filter=Q(bet_type=bet_type))
+    for result, _ in Bet.RESULT_CHOICES:
+        aggregates[f'result_{result}_bet'] = Sum('bet_amount', filter=Q(result=result))
+        aggregates[f'result_{result}_payout'] = Sum('payout_amount', filter=Q(result=result))
+        aggregates[f'result_{result}_count'] = Count('id', filter=Q(result=result))
+    
+    return queryset.order_by().aggregate(**aggregates)
+
+
+def _extremes(queryset):
+    """Mejor apuesta ganada y peor apuesta perdida en una sola consulta."""
+    ranking = Case(
+        When(result=WON, then=F('bet_amount') - F('payout_amount')),
+        default=F('bet_amount'),
+        output_field=DecimalField(max_digits=15, decimal_places=2)
+    )
+    rows = queryset.filter(result__in=[WON, LOST]).annotate(
+        extreme_rank=Window(
+            expression=RowNumber(),
+            partition_by=[F('result')],
+            order_by=[ranking.asc(), F('created_at').desc()]
+        )
+    ).filter(extreme_rank=1)
+    
+    extremes = {bet.result: bet for bet in rows}
+    return extremes.get(WON), extremes.get(LOST)
+
+
+def _analytics(queryset, window=ROLLING_WINDOW):
+    """Rachas, ROI acumulado y tasa de acierto móvil sobre apuestas resueltas."""
+    ordering = [F('date').asc(), F('created_at').asc(), F('id').asc()]
+    net = Case(
+        When(result=WON, then=F('payout_amount') - F('bet_amount')),
+        default=-F('bet_amount'),
+        output_field=DecimalField(max_digits=15, decimal_places=2)
+    )
+    rows = queryset.filter(result__in=[WON, LOST]).annotate(
+        cumulative_bet=Window(expression=Sum('bet_amount'), order_by=ordering),
+        cumulative_net=Window(expression=Sum(net), order_by=ordering),
+        rolling_win_rate=Window(
+            expression=Avg(Case(
+                When(result=WON, then=Value(100.0)),
+                default=Value(0.0),
+                output_field=FloatField()
+            )),
+            order_by=ordering,
+            frame=RowRange(start=-(window - 1), end=0)
+        ),
+    ).order_by(*ordering).values_list('date', 'result', 'cumulative_bet', 'cumulative_net', 'rolling_win_rate')
+    
+    roi_over_time = {}
+    rolling_win_rate = {}
+    longest = {WON: 0, LOST: 0}
+    streak_result = None
+    streak_length = 0
+    
+    for bet_date, result, cumulative_bet, cumulative_net, win_rate in rows:
+        if result == streak_result:
+            streak_length += 1
+        else:
+            streak_result, streak_length = result, 1
+        longest[result] = max(longest[result], streak_length)
+        
+        # Una fila por día con el valor acumulado al cierre del día
+        roi = (cumulative_net / cumulative_bet) * 100 if cumulative_bet else Decimal('0')
+        roi_over_time[bet_date] = {
+            'date': bet_date.isoformat(),
+            'cumulative_bet': float(cumulative_bet),
+            'cumulative_net': float(cumulative_net),
+            'roi': round(float(roi), 2),
+        }
+        rolling_win_rate[bet_date] = {
+            'date': bet_date.isoformat(),
+            'win_rate': round(float(win_rate), 2),
+        }
+    
+    return {
+        'current_streak': {'result': streak_result, 'length': streak_length},
+        'longest_win_streak': longest[WON],
+        'longest_loss_streak': longest[LOST],
+        'roi_over_time': list(roi_over_time.values()),
+        'rolling_win_rate': list(rolling_win_rate.values()),
+        'rolling_window': window,
+    }
+
+
+def compute_statistics(queryset):
+    from .serializers import BetListSerializer
+    
+    totals = _totals(queryset)
+    total_bet = totals['total_bet'] or 0
+    total_won = totals['total_won'] or 0
+    total_lost = totals['total_lost'] or 0
+    won_count = totals['won_count']
+    lost_count = totals['lost_count']
+    
+    # El net_result debe ser: total ganado - total apostado
+    # (las apuestas pendientes cuentan como apostado aún sin resultado)
+    net_result = total_won - total_bet
+    
+    roi = 0
+    if total_bet > 0:
+        roi = ((total_won - total_bet) / total_bet) * 100
+    
+    win_rate = 0
+    if won_count + lost_count > 0:
+        win_rate = (won_count / (won_count + lost_count)) * 100
+    
+    by_type = sorted(
+        (
+            {
+                'bet_type': bet_type,
+                'total_bet': totals[f'type_{bet_type}_bet'],
+                'total_won': totals[f'type_{bet_type}_won'],
+                'count': totals[f'type_{bet_type}_count'],
+            }
+            for bet_type, _ in Bet.BET_TYPES
+            if totals[f'type_{bet_type}_count']
+        ),
+        key=lambda x: x['total_bet'],
+        reverse=True
+    )
+    
+    by_result = [
+        {
+            'result': result,
+            'total_bet': totals[f'result_{result}_bet'],
+            'total_payout': totals[f'result_{result}_payout'],
+            'count': totals[f'result_{result}_count'],
+        }
+        for result, _ in Bet.RESULT_CHOICES
+        if totals[f'result_{result}_count']
+    ]
+    
+    settled = queryset if won_count or lost_count else queryset.none()
+    best_bet, worst_bet = _extremes(settled)
+    
+    return {
+        'total_bet': float(total_bet),
+        'total_won': float(total_won),
+        'total_lost': float(total_lost),
+        'net_result': float(net_result),
+        'roi': round(roi, 2),
+        'total_bets': totals['total_bets'],
+        'won_count': won_count,
+        'lost_count': lost_count,
+        'pending_count': totals['pending_count'],
+        'win_rate': round(win_rate, 2),
+        'best_bet': dict(BetListSerializer(best_bet).data) if best_bet else None,
+        'worst_bet': dict(BetListSerializer(worst_bet).data) if worst_bet else None,
+        'by_type': by_type,
+        'by_result': by_result,
+        'analytics': _analytics(settled),
+    }
+
+
+def get_statistics(user, queryset):
+    """Estadísticas del usuario, cacheadas hasta la próxima escritura de una apuesta."""
+    key = statistics_cache_key(user.id)
+    statistics = cache.get(key)
+    if statistics is None:
+        # Del primario: la réplica puede no tener aún la escritura que invalidó la caché
+        statistics = compute_statistics(queryset.using('default'))
+        cache.set(key, statistics, CACHE_TIMEOUT)
+    return statistics
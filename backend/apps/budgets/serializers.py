@@ -1,11 +1,64 @@
 from rest_framework import serializers
-from django.db.models import Sum
+from django.db.models import Q, Sum
 from django.utils import timezone
 from datetime import timedelta
 from .models import Budget
 from apps.transactions.models import Transaction
 
 
+def period_dates(period, today=None):
+    today = today or timezone.now().date()
+    
+    if period == 'semanal':
+        start = today - timedelta(days=today.weekday())
+        end = start + timedelta(days=6)
+    elif period == 'mensual':
+        start = today.replace(day=1)
+        if today.month == 12:
+            end = today.replace(year=today.year + 1, month=1, day=1) - timedelta(days=1)
+        else:
+            end = today.replace(month=today.month + 1, day=1) - timedelta(days=1)
+    else:
+        start = today.replace(month=1, day=1)
+        end = today.replace(month=12, day=31)
+    
+    return start, end
+
+
+def prefetch_spent(budgets):
+    """
+    Calcula el gasto del período actual de cada presupuesto con una sola
+    consulta agrupada por (usuario, categoría) y lo deja en ``budget._spent``.
+    """
+    if not budgets:
+        return
+    
+    today = timezone.now().date()
+    ranges = {period: period_dates(period, today) for period in {budget.period for budget in budgets}}
+    totals = Transaction.objects.filter(
+        user_id__in={budget.user_id for budget in budgets},
+        category_id__in={budget.category_id for budget in budgets},
+        transaction_type='gasto',
+        date__gte=min(start for start, _ in ranges.values()),
+        date__lte=max(end for _, end in ranges.values())
+    ).values('user_id', 'category_id').annotate(**{
+        period: Sum('amount', filter=Q(date__gte=start, date__lte=end))
+        for period, (start, end) in ranges.items()
+    })
+    spent = {(row['user_id'], row['category_id']): row for row in totals}
+    
+    for budget in budgets:
+        row = spent.get((budget.user_id, budget.category_id))
+        budget._spent = float((row and row[budget.period]) or 0)
+
+
+class BudgetListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        budgets = list(data.all() if hasattr(data, 'all') else data)
+        prefetch_spent(budgets)
+        return super().to_representation(budgets)
+
+
 class BudgetSerializer(serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     category_color = serializers.CharField(source='category.color', read_only=True)
@@ -26,35 +79,25 @@ class BudgetSerializer(serializers.ModelSerializer):
             'is_exceeded', 'is_warning', 'created_at'
         ]
         read_only_fields = ['id', 'created_at']
+        list_serializer_class = BudgetListSerializer
     
     def get_period_dates(self, obj):
-        today = timezone.now().date()
-        
-        if obj.period == 'semanal':
-            start = today - timedelta(days=today.weekday())
-            end = start + timedelta(days=6)
-        elif obj.period == 'mensual':
-            start = today.replace(day=1)
-            if today.month == 12:
-                end = today.replace(year=today.year + 1, month=1, day=1) - timedelta(days=1)
-            else:
-                end = today.replace(month=today.month + 1, day=1) - timedelta(days=1)
-        else:
-            start = today.replace(month=1, day=1)
-            end = today.replace(month=12, day=31)
-        
-        return start, end
+        return period_dates(obj.period)
     
     def get_spent(self, obj):
-        start, end = self.get_period_dates(obj)
-        spent = Transaction.objects.filter(
-            user=obj.user,
-            category=obj.category,
-            transaction_type='gasto',
-            date__gte=start,
-            date__lte=end
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        return float(spent)
+        # Se memoriza en el objeto: percentage, remaining, is_exceeded e
+        # is_warning lo vuelven a pedir
+        if getattr(obj, '_spent', None) is None:
+            start, end = self.get_period_dates(obj)
+            spent = Transaction.objects.filter(
+                user_id=obj.user_id,
+                category_id=obj.category_id,
+                transaction_type='gasto',
+                date__gte=start,
+                date__lte=end
+            ).aggregate(total=Sum('amount'))['total'] or 0
+            obj._spent = float(spent)
+        return obj._spent
     
     def get_percentage(self, obj):
         spent = self.get_spent(obj)
@@ -13,6 +13,23 @@ from apps.transactions.models import Transaction
 from apps.transactions.serializers import TransactionListSerializer
 
 
+def budget_alerts(budgets_data):
+    """Alertas a partir de presupuestos ya serializados con BudgetSerializer."""
+    alerts = []
+    for budget_data in budgets_data:
+        if budget_data['is_exceeded'] or budget_data['is_warning']:
+            alerts.append({
+                'id': budget_data['id'],
+                'category_name': budget_data['category_name'],
+                'category_color': budget_data['category_color'],
+                'percentage': budget_data['percentage'],
+                'is_exceeded': budget_data['is_exceeded'],
+                'amount_limit': budget_data['amount_limit'],
+                'spent': budget_data['spent']
+            })
+    return alerts
+
+
 class BudgetViewSet(viewsets.ModelViewSet):
     serializer_class = BudgetSerializer
     permission_classes = [IsAuthenticated]
@@ -26,21 +43,7 @@ class BudgetViewSet(viewsets.ModelViewSet):
     def alerts(self, request):
         budgets = self.get_queryset().filter(is_active=True)
         serializer = BudgetSerializer(budgets, many=True)
-        
-        alerts = []
-        for budget_data in serializer.data:
-            if budget_data['is_exceeded'] or budget_data['is_warning']:
-                alerts.append({
-                    'id': budget_data['id'],
-                    'category_name': budget_data['category_name'],
-                    'category_color': budget_data['category_color'],
-                    'percentage': budget_data['percentage'],
-                    'is_exceeded': budget_data['is_exceeded'],
-                    'amount_limit': budget_data['amount_limit'],
-                    'spent': budget_data['spent']
-                })
-        
-        return Response(alerts)
+        return Response(budget_alerts(serializer.data))
     
     @action(detail=True, methods=['post'])
     def toggle_active(self, request, pk=None):
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class CategoriesConfig(AppConfig):
+    name = 'apps.categories'
+    verbose_name = 'Categorías'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,144 @@
+from django.core.cache import cache
+from django.db.models import Q
+
+from apps.performance.metrics import record_cache
+
+CACHE_TIMEOUT = 60 * 60 * 24
+# Con caché por proceso las invalidaciones no llegan a los demás workers
+LOCAL_CACHE_TIMEOUT = 60
+DEFAULTS_SCOPE = 'defaults'
+
+NODE_FIELDS = ('id', 'name', 'category_type', 'color', 'icon', 'parent_id', 'is_default', 'user_id')
+
+
+def _version_key(scope):
+    return f'categories:version:{scope}'
+
+
+def _version(scope):
+    return cache.get_or_set(_version_key(scope), 1, None)
+
+
+def _bump(scope):
+    key = _version_key(scope)
+    if cache.add(key, 2, None):
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        # La llave expiró entre add e incr
+        cache.set(key, 2, None)
+
+
+def invalidate_categories(user_id=None):
+    """
+    Invalida el árbol de categorías. Sin ``user_id`` invalida las categorías
+    predeterminadas, que son compartidas por todos los usuarios.
+    """
+    _bump(user_id if user_id is not None else DEFAULTS_SCOPE)
+
+
+def tree_cache_key(user_id):
+    return f'categories:tree:{user_id}:{_version(DEFAULTS_SCOPE)}:{_version(user_id)}'
+
+
+def _timeout():
+    from apps.performance.caching import cache_is_shared
+    
+    return CACHE_TIMEOUT if cache_is_shared() else LOCAL_CACHE_TIMEOUT
+
+
+def _node(category):
+    node = {field: category[field] for field in NODE_FIELDS}
+    node['subcategories'] = []
+    return node
+
+
+def build_category_tree(user_id):
+    from .models import Category
+    
+    # Siempre del primario: si se leyera de la réplica tras una invalidación
+    # se cachearía un árbol atrasado hasta la siguiente escritura
+    rows = Category.objects.using('default').filter(
+        Q(user_id=user_id) | Q(is_default=True, user__isnull=True)
+    ).order_by('category_type', 'name').values(*NODE_FIELDS)
+    
+    nodes = {row['id']: _node(row) for row in rows}
+    for node in nodes.values():
+        parent = nodes.get(node['parent_id'])
+        if parent is not None:
+            parent['subcategories'].append(node['id'])
+    return nodes
+
+
+def get_category_tree(user):
+    """
+    Categorías disponibles para el usuario (propias y predeterminadas) como
+    ``{id: nodo}``. Cada nodo incluye ``parent_id`` y los ids de sus
+    subcategorías. Se cachea hasta la próxima escritura de una categoría.
+    """
+    user_id = getattr(user, 'id', user)
+    key = tree_cache_key(user_id)
+    tree = cache.get(key)
+    record_cache('categories', tree is not None)
+    if tree is None:
+        tree = build_category_tree(user_id)
+        cache.set(key, tree, _timeout())
+    return tree
+
+
+def get_category(user, category_id, tree=None):
+    """
+    Nodo de la categoría si está disponible para el usuario, o None. Si no
+    está en el árbol cacheado se confirma en la base de datos antes de
+    rechazarla: el árbol puede ser anterior a la creación de la categoría.
+    """
+    from .models import Category
+    
+    try:
+        category_id = int(category_id)
+    except (TypeError, ValueError):
+        return None
+    
+    tree = tree if tree is not None else get_category_tree(user)
+    node = tree.get(category_id)
+    if node is not None:
+        return node
+    
+    user_id = getattr(user, 'id', user)
+    row = Category.objects.using('default').filter(
+        Q(user_id=user_id) | Q(is_default=True, user__isnull=True),
+        id=category_id
+    ).values(*NODE_FIELDS).first()
+    if row is None:
+        return None
+    invalidate_categories(row['user_id'])
+    return _node(row)
+
+
+def category_details(user, category_ids, tree=None):
+    """
+    Nombre, color, icono y padre de cada categoría pedida. Las que no están en
+    el árbol del usuario (datos huérfanos) se leen en una sola consulta.
+    """
+    from .models import Category
+    
+    tree = tree if tree is not None else get_category_tree(user)
+    details = {}
+    missing = set()
+    for category_id in category_ids:
+        if category_id is None:
+            continue
+        if category_id in tree:
+            details[category_id] = tree[category_id]
+        else:
+            missing.add(category_id)
+    
+    if missing:
+        for row in Category.objects.filter(id__in=missing).values(*NODE_FIELDS):
+            details[row['id']] = _node(row)
+    
+    parent_ids = {d['parent_id'] for d in details.values() if d['parent_id'] and d['parent_id'] not in details}
+    if parent_ids:
+        details.update(category_details(user, parent_ids, tree))
+    return details
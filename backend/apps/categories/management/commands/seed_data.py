@@ -36,10 +36,10 @@ class Command(BaseCommand):
         
         existing_default_categories = Category.objects.filter(is_default=True, user__isnull=True)
         existing_default_count = existing_default_categories.count()
-        logger.info(f'Found {existing_default_count} existing default categories')
+        logger.info('Found %s existing default categories', existing_default_count)
         
         if existing_default_count > 0:
-            logger.info(f'Existing default category IDs: {list(existing_default_categories.values_list("id", "name"))}')
+            logger.info('Existing default category IDs: %s', list(existing_default_categories.values_list("id", "name")))
         
         alimentacion, created = Category.objects.get_or_create(
             name='Alimentación',
@@ -52,12 +52,12 @@ class Command(BaseCommand):
             }
         )
         if created:
-            logger.info(f'Created default category: Alimentación (id={alimentacion.id})')
+            logger.info('Created default category: Alimentación (id=%s)', alimentacion.id)
         else:
-            logger.info(f'Using existing default category: Alimentación (id={alimentacion.id})')
+            logger.info('Using existing default category: Alimentación (id=%s)', alimentacion.id)
             
             transactions_count = Transaction.objects.filter(category=alimentacion).count()
-            logger.info(f'Category "Alimentación" (id={alimentacion.id}) is referenced by {transactions_count} transactions')
+            logger.info('Category "Alimentación" (id=%s) is referenced by %s transactions', alimentacion.id, transactions_count)
         
         subcats = [
             {'name': 'Supermercado', 'color': '#EF4444', 'icon': 'shopping-cart'},
@@ -77,9 +77,9 @@ class Command(BaseCommand):
                 }
             )
             if created:
-                logger.info(f'Created default subcategory: {sub["name"]} (id={subcat.id})')
+                logger.info('Created default subcategory: %s (id=%s)', sub["name"], subcat.id)
             else:
-                logger.debug(f'Using existing default subcategory: {sub["name"]} (id={subcat.id})')
+                logger.debug('Using existing default subcategory: %s (id=%s)', sub["name"], subcat.id)
         
         otros_ingresos, created = Category.objects.get_or_create(
             name='Otros ingresos',
@@ -92,12 +92,12 @@ class Command(BaseCommand):
             }
         )
         if created:
-            logger.info(f'Created default category: Otros ingresos (id={otros_ingresos.id})')
+            logger.info('Created default category: Otros ingresos (id=%s)', otros_ingresos.id)
         else:
-            logger.info(f'Using existing default category: Otros ingresos (id={otros_ingresos.id})')
+            logger.info('Using existing default category: Otros ingresos (id=%s)', otros_ingresos.id)
         
         final_count = Category.objects.filter(is_default=True, user__isnull=True).count()
-        logger.info(f'Total default categories after seed: {final_count}')
+        logger.info('Total default categories after seed: %s', final_count)
     
     def create_demo_user(self):
         user, created = User.objects.get_or_create(
@@ -164,11 +164,11 @@ class Command(BaseCommand):
         expense_cats = list(Category.objects.filter(category_type='gasto', is_default=True, parent__isnull=True))
         income_cats = list(Category.objects.filter(category_type='ingreso', is_default=True))
         
-        logger.info(f'Found {len(expense_cats)} expense categories and {len(income_cats)} income categories for demo transactions')
+        logger.info('Found %s expense categories and %s income categories for demo transactions', len(expense_cats), len(income_cats))
         if expense_cats:
-            logger.debug(f'Expense categories: {[c.name for c in expense_cats]}')
+            logger.debug('Expense categories: %s', [c.name for c in expense_cats])
         if income_cats:
-            logger.debug(f'Income categories: {[c.name for c in income_cats]}')
+            logger.debug('Income categories: %s', [c.name for c in income_cats])
         
         today = date.today()
         
@@ -177,7 +177,7 @@ class Command(BaseCommand):
             
             try:
                 salary_category = Category.objects.get(name='Salario', is_default=True, user__isnull=True)
-                logger.debug(f'Using salary category: {salary_category.name} (id={salary_category.id})')
+                logger.debug('Using salary category: %s (id=%s)', salary_category.name, salary_category.id)
                 Transaction.objects.get_or_create(
                     user=user,
                     description=f'Salario mes {month_start.month}',
@@ -190,10 +190,10 @@ class Command(BaseCommand):
                     }
                 )
             except Category.DoesNotExist:
-                logger.warning(f'Category "Salario" not found, skipping salary transaction for month {month_start.month}')
+                logger.warning('Category "Salario" not found, skipping salary transaction for month %s', month_start.month)
             except Category.MultipleObjectsReturned:
                 salary_category = Category.objects.filter(name='Salario', is_default=True, user__isnull=True).first()
-                logger.warning(f'Multiple "Salario" categories found, using first one (id={salary_category.id})')
+                logger.warning('Multiple "Salario" categories found, using first one (id=%s)', salary_category.id)
                 Transaction.objects.get_or_create(
                     user=user,
                     description=f'Salario mes {month_start.month}',
@@ -255,7 +255,7 @@ class Command(BaseCommand):
             category = next((c for c in expense_cats if c.name == 'Alimentación' and c.is_default and c.user is None), None)
             if not category:
                 category = expense_cats[0] if expense_cats else None
-                logger.warning(f'Default "Alimentación" category not found, using first available category')
+                logger.warning('Default "Alimentación" category not found, using first available category')
             if not category:
                 logger.error('No expense categories available for ant expenses')
                 continue
@@ -34,31 +34,27 @@ class CategoryViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
-        queryset = Category.objects.filter(
+        return Category.objects.filter(
             Q(user=user) | Q(is_default=True, user__isnull=True)
         ).select_related('parent').prefetch_related('subcategories')
-        logger.debug(f"get_queryset: usuario={user.id}, total categorías={queryset.count()}")
-        logger.debug(f"get_queryset: categorías del usuario={queryset.filter(user=user).count()}")
-        logger.debug(f"get_queryset: categorías predeterminadas={queryset.filter(is_default=True, user__isnull=True).count()}")
-        return queryset
     
     def perform_create(self, serializer):
         user = self.request.user
-        logger.info(f"perform_create: usuario={user.id}, email={user.email}")
+        logger.info("perform_create: usuario=%s, email=%s", user.id, user.email)
         
         try:
             with transaction.atomic():
                 instance = serializer.save(user=user)
-                logger.info(f"perform_create: categoría creada con id={instance.id}, name={instance.name}, user={instance.user_id}, category_type={instance.category_type}")
+                logger.info("perform_create: categoría creada con id=%s, name=%s, user=%s, category_type=%s", instance.id, instance.name, instance.user_id, instance.category_type)
                 
                 saved = Category.objects.get(id=instance.id)
-                logger.info(f"perform_create: categoría guardada correctamente - id={saved.id}, name={saved.name}, user={saved.user_id}, category_type={saved.category_type}, is_default={saved.is_default}")
+                logger.info("perform_create: categoría guardada correctamente - id=%s, name=%s, user=%s, category_type=%s, is_default=%s", saved.id, saved.name, saved.user_id, saved.category_type, saved.is_default)
                 
                 if saved.user_id != user.id:
-                    logger.error(f"perform_create: ERROR - categoría guardada con user_id={saved.user_id} pero se esperaba user_id={user.id}")
+                    logger.error("perform_create: ERROR - categoría guardada con user_id=%s pero se esperaba user_id=%s", saved.user_id, user.id)
                     raise ValueError(f"Categoría no se guardó con el usuario correcto")
         except Exception as e:
-            logger.error(f"perform_create: Error al crear categoría: {str(e)}", exc_info=True)
+            logger.error("perform_create: Error al crear categoría: %s", e, exc_info=True)
             raise
     
     def perform_destroy(self, instance):
@@ -72,14 +68,14 @@ class CategoryViewSet(viewsets.ModelViewSet):
         purchase_items_count = PurchaseItem.objects.filter(category=instance).count()
         
         if transactions_count > 0 or purchase_items_count > 0:
-            logger.warning(f'Attempted to delete category {instance.id} ({instance.name}) which is in use: {transactions_count} transactions, {purchase_items_count} purchase items')
+            logger.warning('Attempted to delete category %s (%s) which is in use: %s transactions, %s purchase items', instance.id, instance.name, transactions_count, purchase_items_count)
             from rest_framework.exceptions import ValidationError
             raise ValidationError(
                 f'No se puede eliminar la categoría "{instance.name}" porque está siendo utilizada en {transactions_count + purchase_items_count} transacción(es). '
                 'Primero debe actualizar o eliminar las transacciones que usan esta categoría.'
             )
         
-        logger.info(f'Deleting category {instance.id} ({instance.name}) - no transactions found')
+        logger.info('Deleting category %s (%s) - no transactions found', instance.id, instance.name)
         instance.delete()
     
     @action(detail=False, methods=['get'])
@@ -108,13 +104,13 @@ class SecondaryCategoryViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         user = self.request.user
-        logger.info(f"perform_create SecondaryCategory: usuario={user.id}")
+        logger.info("perform_create SecondaryCategory: usuario=%s", user.id)
         try:
             with transaction.atomic():
                 instance = serializer.save(user=user)
-                logger.info(f"perform_create SecondaryCategory: categoría creada con id={instance.id}, name={instance.name}, user={instance.user_id}")
+                logger.info("perform_create SecondaryCategory: categoría creada con id=%s, name=%s, user=%s", instance.id, instance.name, instance.user_id)
         except Exception as e:
-            logger.error(f"perform_create SecondaryCategory: Error al crear categoría secundaria: {str(e)}", exc_info=True)
+            logger.error("perform_create SecondaryCategory: Error al crear categoría secundaria: %s", e, exc_info=True)
             raise
 
 
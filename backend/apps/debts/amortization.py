@@ -0,0 +1,286 @@
+import hashlib
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+
+from dateutil.relativedelta import relativedelta
+from django.core.cache import cache
+
+CENT = Decimal('0.01')
+ZERO = Decimal('0')
+MAX_MONTHS = 360
+# Mismo tope que los montos del modelo (max_digits=15, decimal_places=2)
+MAX_AMOUNT = Decimal('1e13')
+DEFAULT_TERM_MONTHS = 12
+CACHE_TIMEOUT = 60 * 60 * 24
+
+METHODS = ('frances', 'simple')
+STRATEGIES = ('avalanche', 'snowball')
+
+
+class AmortizationError(ValueError):
+    pass
+
+
+def _money(value):
+    return Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def monthly_rate(annual_rate):
+    if not annual_rate:
+        return ZERO
+    return Decimal(annual_rate) / Decimal('1200')
+
+
+def months_between(start, end):
+    delta = relativedelta(end, start)
+    return delta.years * 12 + delta.months + (1 if delta.days > 0 else 0)
+
+
+def annuity_payment(principal, rate, months):
+    """Cuota fija del sistema francés."""
+    if months <= 0:
+        return _money(principal)
+    if rate == 0:
+        return _money(principal / months)
+    factor = (1 + rate) ** months
+    return _money(principal * rate * factor / (factor - 1))
+
+
+def schedule_start(debt, today=None):
+    today = today or date.today()
+    return max(debt.start_date, today)
+
+
+def debt_term(debt, start):
+    if debt.due_date and debt.due_date > start:
+        return min(months_between(start, debt.due_date), MAX_MONTHS)
+    return DEFAULT_TERM_MONTHS
+
+
+def build_schedule(principal, annual_rate, start, months=None, payment=None, method='frances', extra=ZERO):
+    """
+    Genera la tabla de amortización mes a mes.
+    
+    Con ``method='frances'`` el interés se calcula sobre el saldo insoluto y la
+    cuota es constante. Con ``method='simple'`` el interés es plano sobre el
+    capital inicial. ``extra`` es un abono adicional a capital en cada cuota.
+    """
+    if method not in METHODS:
+        raise AmortizationError(f'Método inválido, use uno de: {", ".join(METHODS)}')
+    
+    if months is not None and not 0 < months <= MAX_MONTHS:
+        raise AmortizationError(f'El plazo debe estar entre 1 y {MAX_MONTHS} meses.')
+    
+    principal = _money(principal)
+    extra = _money(extra or 0)
+    rate = monthly_rate(annual_rate)
+    
+    if payment is None:
+        months = months or DEFAULT_TERM_MONTHS
+        if method == 'frances':
+            payment = annuity_payment(principal, rate, months)
+        else:
+            payment = _money(principal / months + principal * rate)
+    else:
+        payment = _money(payment)
+    
+    flat_interest = _money(principal * rate)
+    if principal > 0 and payment + extra <= flat_interest:
+        raise AmortizationError('La cuota no alcanza a cubrir los intereses del período.')
+    
+    installments = []
+    balance = principal
+    total_interest = ZERO
+    total_paid = ZERO
+    number = 0
+    
+    while balance > 0 and number < MAX_MONTHS:
+        number += 1
+        interest = flat_interest if method == 'simple' else _money(balance * rate)
+        scheduled_principal = min(payment - interest, balance)
+        extra_principal = min(extra, balance - scheduled_principal)
+        principal_paid = scheduled_principal + extra_principal
+        balance -= principal_paid
+        total_interest += interest
+        total_paid += interest + principal_paid
+        
+        installments.append({
+            'number': number,
+            'date': (start + relativedelta(months=number)).isoformat(),
+            'payment': interest + scheduled_principal,
+            'interest': interest,
+            'principal': scheduled_principal,
+            'extra': extra_principal,
+            'balance': balance,
+        })
+    
+    return {
+        'method': method,
+        'principal': principal,
+        'monthly_payment': payment,
+        'extra_payment': extra,
+        'months': number,
+        'payoff_date': installments[-1]['date'] if installments else None,
+        'total_interest': total_interest,
+        'total_paid': total_paid,
+        # La tabla se corta en MAX_MONTHS cuotas aunque quede saldo
+        'truncated': balance > 0,
+        'remaining_balance': balance,
+        'installments': installments,
+    }
+
+
+def simulate_strategy(debts, strategy='avalanche', extra=ZERO, start=None, rollover=True):
+    """
+    Simula el pago conjunto de varias deudas.
+    
+    Cada mes se paga la cuota mínima de cada deuda y el excedente (``extra``
+    más las cuotas liberadas por deudas ya pagadas, si ``rollover``) se abona a
+    la deuda prioritaria: mayor tasa en ``avalanche``, menor saldo en
+    ``snowball``.
+    """
+    if strategy not in STRATEGIES:
+        raise AmortizationError(f'Estrategia inválida, use una de: {", ".join(STRATEGIES)}')
+    
+    start = start or date.today()
+    extra = _money(extra or 0)
+    
+    if strategy == 'avalanche':
+        priority = sorted(debts, key=lambda d: (-d['rate'], d['balance']))
+    else:
+        priority = sorted(debts, key=lambda d: (d['balance'], -d['rate']))
+    
+    state = [
+        {
+            'id': d['id'],
+            'name': d['name'],
+            'balance': _money(d['balance']),
+            'rate': monthly_rate(d['rate']),
+            'min_payment': _money(d['min_payment']),
+            'interest': ZERO,
+            'paid_off_month': None,
+        }
+        for d in priority
+    ]
+    budget = sum((d['min_payment'] for d in state), ZERO) + extra
+    
+    month = 0
+    active = [d for d in state if d['balance'] > 0]
+    while active and month < MAX_MONTHS:
+        month += 1
+        available = budget if rollover else extra
+        
+        for debt in active:
+            interest = _money(debt['balance'] * debt['rate'])
+            debt['interest'] += interest
+            debt['balance'] += interest
+            paid = min(debt['min_payment'], debt['balance'])
+            debt['balance'] -= paid
+            if rollover:
+                available -= paid
+        
+        for debt in active:
+            if available <= 0:
+                break
+            if debt['balance'] <= 0:
+                continue
+            paid = min(available, debt['balance'])
+            debt['balance'] -= paid
+            available -= paid
+        
+        still_active = []
+        for debt in active:
+            if debt['balance'] <= 0:
+                debt['paid_off_month'] = month
+            else:
+                still_active.append(debt)
+        active = still_active
+    
+    results = [
+        {
+            'id': d['id'],
+            'name': d['name'],
+            'total_interest': d['interest'],
+            'months': d['paid_off_month'],
+            'payoff_date': (start + relativedelta(months=d['paid_off_month'])).isoformat() if d['paid_off_month'] else None,
+            'remaining_balance': max(d['balance'], ZERO),
+        }
+        for d in state
+    ]
+    
+    return {
+        'strategy': strategy,
+        'extra_payment': extra,
+        'monthly_budget': budget,
+        'months': month,
+        'debt_free_date': (start + relativedelta(months=month)).isoformat() if month else None,
+        'total_interest': sum((d['total_interest'] for d in results), ZERO),
+        'truncated': bool(active),
+        'remaining_balance': sum((d['remaining_balance'] for d in results), ZERO),
+        'order': [d['id'] for d in results],
+        'debts': results,
+    }
+
+
+def _cache_key(prefix, debts, params):
+    fingerprint = '|'.join(f'{d.pk}:{d.updated_at.timestamp()}:{d.paid_amount}' for d in debts)
+    params_key = '|'.join(f'{k}={params[k]}' for k in sorted(params))
+    digest = hashlib.md5(f'{fingerprint}#{params_key}#{date.today().isoformat()}'.encode()).hexdigest()
+    return f'debts:v2:{prefix}:{digest}'
+
+
+def debt_schedule(debt, method='frances', extra=ZERO, months=None, payment=None):
+    """Tabla de amortización del saldo pendiente, cacheada hasta que cambie la deuda o sus pagos."""
+    params = {'method': method, 'extra': extra, 'months': months, 'payment': payment}
+    key = _cache_key(f'schedule:{debt.pk}', [debt], params)
+    result = cache.get(key)
+    if result is None:
+        start = schedule_start(debt)
+        result = build_schedule(
+            debt.remaining_amount,
+            debt.interest_rate,
+            start,
+            months=months or debt_term(debt, start),
+            payment=payment,
+            method=method,
+            extra=extra,
+        )
+        result['debt'] = debt.pk
+        cache.set(key, result, CACHE_TIMEOUT)
+    return result
+
+
+def debts_strategy(debts, strategy='avalanche', extra=ZERO):
+    """Compara la estrategia elegida contra pagar solo las cuotas mínimas."""
+    debts = [d for d in debts if d.remaining_amount > 0]
+    params = {'strategy': strategy, 'extra': extra}
+    key = _cache_key('strategy', debts, params)
+    result = cache.get(key)
+    if result is not None:
+        return result
+    
+    today = date.today()
+    rows = []
+    for debt in debts:
+        start = schedule_start(debt, today)
+        rate = monthly_rate(debt.interest_rate)
+        rows.append({
+            'id': debt.pk,
+            'name': debt.name,
+            'balance': debt.remaining_amount,
+            'rate': debt.interest_rate or ZERO,
+            'min_payment': annuity_payment(debt.remaining_amount, rate, debt_term(debt, start)),
+        })
+    
+    plan = simulate_strategy(rows, strategy=strategy, extra=extra, start=today)
+    baseline = simulate_strategy(rows, strategy=strategy, extra=ZERO, start=today, rollover=False)
+    plan['baseline'] = {
+        'months': baseline['months'],
+        'total_interest': baseline['total_interest'],
+        'debt_free_date': baseline['debt_free_date'],
+    }
+    plan['interest_saved'] = baseline['total_interest'] - plan['total_interest']
+    plan['months_saved'] = baseline['months'] - plan['months']
+    
+    cache.set(key, plan, CACHE_TIMEOUT)
+    return plan
@@ -1,5 +1,7 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
 from django.conf import settings
+from django.utils import timezone
 from apps.accounts.models import Account
 
 
@@ -54,6 +56,37 @@ class Debt(models.Model):
         if self.total_amount > 0:
             return (self.paid_amount / self.total_amount) * 100
         return 0
+    
+    @classmethod
+    def apply_payments(cls, deltas, now=None):
+        """
+        Suma a paid_amount los montos de ``deltas`` ({debt_id: monto}) en una
+        sola sentencia UPDATE con F(), recalculando is_paid en SQL. ``now`` es
+        el updated_at que se escribe (por defecto el momento actual).
+        """
+        deltas = {debt_id: amount for debt_id, amount in deltas.items() if amount}
+        if not deltas:
+            return 0
+        
+        delta = Case(
+            *[When(pk=debt_id, then=Value(amount)) for debt_id, amount in deltas.items()],
+            default=Value(0),
+            output_field=models.DecimalField(max_digits=15, decimal_places=2)
+        )
+        return cls.objects.filter(pk__in=deltas.keys()).update(
+            paid_amount=F('paid_amount') + delta,
+            is_paid=Case(
+                When(total_amount__lte=F('paid_amount') + delta, then=Value(True)),
+                default=Value(False)
+            ),
+            updated_at=now or timezone.now()
+        )
+    
+    def _apply_local_payment(self, amount, now):
+        # Refleja en memoria lo que el UPDATE calculó en la base de datos
+        self.paid_amount += amount
+        self.is_paid = self.paid_amount >= self.total_amount
+        self.updated_at = now
 
 
 class DebtPayment(models.Model):
@@ -69,21 +102,31 @@ class DebtPayment(models.Model):
         ordering = ['-payment_date']
     
     def save(self, *args, **kwargs):
-        is_new = self.pk is None
-        super().save(*args, **kwargs)
+        now = timezone.now()
+        with transaction.atomic():
+            delta = self.amount
+            if self.pk is not None:
+                old_amount = DebtPayment.objects.select_for_update().filter(
+                    pk=self.pk
+                ).values_list('amount', flat=True).first()
+                if old_amount is not None:
+                    delta = self.amount - old_amount
+            
+            super().save(*args, **kwargs)
+            Debt.apply_payments({self.debt_id: delta}, now=now)
         
-        if is_new:
-            self.debt.paid_amount += self.amount
-            if self.debt.paid_amount >= self.debt.total_amount:
-                self.debt.is_paid = True
-            self.debt.save()
+        if delta and DebtPayment.debt.is_cached(self):
+            self.debt._apply_local_payment(delta, now)
     
     def delete(self, *args, **kwargs):
-        self.debt.paid_amount -= self.amount
-        if self.debt.paid_amount < self.debt.total_amount:
-            self.debt.is_paid = False
-        self.debt.save()
-        super().delete(*args, **kwargs)
+        now = timezone.now()
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            Debt.apply_payments({self.debt_id: -self.amount}, now=now)
+        
+        if DebtPayment.debt.is_cached(self):
+            self.debt._apply_local_payment(-self.amount, now)
+        return result
 
 
 
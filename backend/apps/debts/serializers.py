@@ -9,6 +9,19 @@ class DebtPaymentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
+class DebtBulkPaymentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DebtPayment
+        fields = ['id', 'debt', 'amount', 'payment_date', 'notes', 'created_at']
+        read_only_fields = ['id', 'created_at']
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request:
+            self.fields['debt'].queryset = Debt.objects.filter(user=request.user)
+
+
 class DebtSerializer(serializers.ModelSerializer):
     debt_type_display = serializers.CharField(source='get_debt_type_display', read_only=True)
     account_name = serializers.CharField(source='account.name', read_only=True)
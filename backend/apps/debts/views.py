@@ -3,10 +3,16 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db import transaction
 from django.db.models import Sum
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
 
 from .models import Debt, DebtPayment
-from .serializers import DebtSerializer, DebtListSerializer, DebtPaymentSerializer
+from .serializers import (
+    DebtSerializer, DebtListSerializer, DebtPaymentSerializer, DebtBulkPaymentSerializer
+)
+from .amortization import MAX_AMOUNT, MAX_MONTHS, AmortizationError, debt_schedule, debts_strategy
 
 
 class DebtViewSet(viewsets.ModelViewSet):
@@ -55,16 +61,98 @@ class DebtViewSet(viewsets.ModelViewSet):
         serializer = DebtPaymentSerializer(data=request.data)
         
         if serializer.is_valid():
-            serializer.save(debt=debt)
-            return Response(DebtSerializer(debt).data)
+            # El pago actualiza paid_amount/is_paid de `debt` en memoria, sin volver a consultarla
+            payment = serializer.save(debt=debt)
+            payments = sorted(
+                [payment, *debt.payments.all()],
+                key=lambda p: (p.payment_date, p.created_at),
+                reverse=True
+            )
+            data = DebtSerializer(debt).data
+            data['payments'] = DebtPaymentSerializer(payments, many=True).data
+            return Response(data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=False, methods=['post'])
+    def bulk_payments(self, request):
+        payments_data = request.data.get('payments') if hasattr(request.data, 'get') else request.data
+        serializer = DebtBulkPaymentSerializer(data=payments_data, many=True, context={'request': request})
+        
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        deltas = defaultdict(Decimal)
+        payments = []
+        for item in serializer.validated_data:
+            deltas[item['debt'].pk] += item['amount']
+            payments.append(DebtPayment(**item))
+        
+        with transaction.atomic():
+            created = DebtPayment.objects.bulk_create(payments)
+            Debt.apply_payments(deltas)
+        
+        debts = Debt.objects.filter(pk__in=deltas.keys())
+        return Response({
+            'created': len(created),
+            'debts': DebtListSerializer(debts, many=True).data
+        }, status=status.HTTP_201_CREATED)
+    
     @action(detail=True, methods=['get'])
     def payments(self, request, pk=None):
         debt = self.get_object()
         payments = debt.payments.all()
         serializer = DebtPaymentSerializer(payments, many=True)
         return Response(serializer.data)
+    
+    def _decimal_param(self, name, default=None):
+        value = self.request.query_params.get(name)
+        if value in (None, ''):
+            return default
+        try:
+            value = Decimal(value)
+        except InvalidOperation:
+            raise AmortizationError(f'{name} debe ser numérico')
+        if not value.is_finite() or value < 0:
+            raise AmortizationError(f'{name} debe ser un número positivo')
+        if value >= MAX_AMOUNT:
+            raise AmortizationError(f'{name} debe ser menor que {MAX_AMOUNT:,.0f}')
+        return value
+    
+    def _months_param(self):
+        months = self._decimal_param('months')
+        if months is None:
+            return None
+        if months != months.to_integral_value() or not 0 < months <= MAX_MONTHS:
+            raise AmortizationError(f'months debe ser un entero entre 1 y {MAX_MONTHS}')
+        return int(months)
+    
+    @action(detail=True, methods=['get'])
+    def schedule(self, request, pk=None):
+        debt = self.get_object()
+        try:
+            result = debt_schedule(
+                debt,
+                method=request.query_params.get('method', 'frances'),
+                extra=self._decimal_param('extra', Decimal('0')),
+                months=self._months_param(),
+                payment=self._decimal_param('payment'),
+            )
+        except AmortizationError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+    
+    @action(detail=False, methods=['get'])
+    def strategy(self, request):
+        debts = Debt.objects.filter(user=request.user, debt_type='deuda', is_paid=False)
+        try:
+            result = debts_strategy(
+                debts,
+                strategy=request.query_params.get('strategy', 'avalanche'),
+                extra=self._decimal_param('extra', Decimal('0')),
+            )
+        except AmortizationError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
 
 
 
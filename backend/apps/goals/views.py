@@ -30,7 +30,7 @@ class GoalViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
-        logger.info(f'Goal created: user={self.request.user.id}, type={serializer.validated_data.get("goal_type")}')
+        logger.info('Goal created: user=%s, type=%s', self.request.user.id, serializer.validated_data.get("goal_type"))
     
     @action(detail=False, methods=['get'])
     def active(self, request):
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Investment
+from .models import Investment, InvestmentValuation
 
 
 @admin.register(Investment)
@@ -9,6 +9,13 @@ class InvestmentAdmin(admin.ModelAdmin):
     search_fields = ['name']
 
 
+@admin.register(InvestmentValuation)
+class InvestmentValuationAdmin(admin.ModelAdmin):
+    list_display = ['investment', 'date', 'value']
+    list_filter = ['date']
+    search_fields = ['investment__name']
+
+
 
 
 
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+
+from apps.investments.valuations import (
+    BATCH_SIZE, ValuationImportError, import_valuations, parse_valuation_file
+)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Importa valorizaciones históricas de inversiones desde un archivo CSV o JSON'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Archivo con columnas investment, date, value')
+        parser.add_argument('--user', required=True, help='Email del usuario dueño de las inversiones')
+        parser.add_argument('--format', choices=['csv', 'json'], help='Formato del archivo (por defecto según extensión)')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Filas por sentencia INSERT')
+    
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(email=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f'Usuario {options["user"]} no encontrado')
+        
+        try:
+            with open(options['path'], 'rb') as file_obj:
+                rows = parse_valuation_file(file_obj, options.get('format'))
+        except OSError as e:
+            raise CommandError(f'No se pudo leer el archivo: {e}')
+        except ValueError as e:
+            raise CommandError(f'Archivo inválido: {e}')
+        
+        self.stdout.write(f'Importando {len(rows)} filas...')
+        
+        try:
+            result = import_valuations(user, rows, batch_size=options['batch_size'])
+        except ValuationImportError as e:
+            for error in e.errors[:20]:
+                self.stderr.write(error)
+            if len(e.errors) > 20:
+                self.stderr.write(f'... y {len(e.errors) - 20} errores más')
+            raise CommandError('La importación fue cancelada, no se guardaron cambios')
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'Importadas {result["rows"]} valorizaciones para {result["investments"]} inversiones'
+        ))
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.1 on 2026-10-19 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvestmentValuation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Fecha')),
+                ('value', models.DecimalField(decimal_places=2, max_digits=15, verbose_name='Valor')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('investment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='valuations', to='investments.investment', verbose_name='Inversión')),
+            ],
+            options={
+                'verbose_name': 'Valorización',
+                'verbose_name_plural': 'Valorizaciones',
+                'ordering': ['-date'],
+                'constraints': [models.UniqueConstraint(fields=('investment', 'date'), name='unique_investment_valuation_date')],
+            },
+        ),
+    ]
@@ -59,6 +59,30 @@ class Investment(models.Model):
         return 0
 
 
+class InvestmentValuation(models.Model):
+    investment = models.ForeignKey(
+        Investment,
+        on_delete=models.CASCADE,
+        related_name='valuations',
+        verbose_name='Inversión'
+    )
+    date = models.DateField(verbose_name='Fecha')
+    value = models.DecimalField(max_digits=15, decimal_places=2, verbose_name='Valor')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Valorización'
+        verbose_name_plural = 'Valorizaciones'
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['investment', 'date'], name='unique_investment_valuation_date'),
+        ]
+    
+    def __str__(self):
+        return f"{self.investment.name} - {self.date}: {self.value}"
+
+
 
 
 
@@ -0,0 +1,155 @@
+import csv
+import io
+import json
+import logging
+import time
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from apps.performance.metrics import import_duration, import_rows
+
+from .models import Investment, InvestmentValuation
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 5000
+
+_value_field = InvestmentValuation._meta.get_field('value')
+CENT = Decimal(1).scaleb(-_value_field.decimal_places)
+# Tope de la columna (max_digits=15, decimal_places=2); más dígitos darían DataError
+MAX_VALUE = Decimal(10) ** (_value_field.max_digits - _value_field.decimal_places)
+
+
+class ValuationImportError(ValueError):
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__('; '.join(errors[:10]))
+
+
+def parse_valuation_file(file_obj, file_format=None):
+    """Lee un archivo CSV o JSON con filas (investment, date, value)."""
+    name = getattr(file_obj, 'name', '') or ''
+    if not file_format:
+        file_format = 'json' if name.lower().endswith('.json') else 'csv'
+    
+    content = file_obj.read()
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+    
+    if file_format == 'json':
+        data = json.loads(content)
+        if isinstance(data, dict):
+            data = data.get('rows', [])
+        if not isinstance(data, list):
+            raise ValuationImportError(['El JSON debe ser una lista de filas o un objeto con "rows".'])
+        return data
+    
+    return list(csv.DictReader(io.StringIO(content)))
+
+
+def _resolve_investments(user):
+    by_id = {}
+    by_name = {}
+    for inv_id, inv_name in Investment.objects.filter(user=user).values_list('id', 'name'):
+        by_id[inv_id] = inv_id
+        by_name[inv_name.strip().lower()] = inv_id
+    
+    def resolve(ref):
+        ref = str(ref if ref is not None else '').strip()
+        if ref.isdigit() and int(ref) in by_id:
+            return by_id[int(ref)]
+        return by_name.get(ref.lower())
+    
+    return resolve
+
+
+def clean_valuation_rows(user, rows):
+    """Valida las filas y devuelve un dict {(investment_id, date): value} sin duplicados."""
+    resolve = _resolve_investments(user)
+    cleaned = {}
+    errors = []
+    
+    for idx, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append(f'Fila {idx}: formato inválido')
+            continue
+        
+        investment_id = resolve(row.get('investment'))
+        if investment_id is None:
+            errors.append(f'Fila {idx}: inversión "{row.get("investment")}" no encontrada')
+            continue
+        
+        try:
+            row_date = date.fromisoformat(str(row.get('date', '')).strip())
+        except ValueError:
+            errors.append(f'Fila {idx}: fecha inválida "{row.get("date")}"')
+            continue
+        
+        try:
+            value = Decimal(str(row.get('value', '')).strip())
+        except InvalidOperation:
+            value = None
+        if value is None or not value.is_finite():
+            errors.append(f'Fila {idx}: valor inválido "{row.get("value")}"')
+            continue
+        
+        if value < 0:
+            errors.append(f'Fila {idx}: el valor no puede ser negativo')
+            continue
+        
+        if value >= MAX_VALUE or value.quantize(CENT, rounding=ROUND_HALF_UP) >= MAX_VALUE:
+            errors.append(f'Fila {idx}: el valor debe ser menor que {MAX_VALUE:,.0f}')
+            continue
+        
+        cleaned[(investment_id, row_date)] = value.quantize(CENT, rounding=ROUND_HALF_UP)
+    
+    if errors:
+        raise ValuationImportError(errors)
+    
+    return cleaned
+
+
+def refresh_current_amounts(investment_ids):
+    """Actualiza current_amount con la última valorización en una sola sentencia."""
+    latest_value = InvestmentValuation.objects.filter(
+        investment=OuterRef('pk')
+    ).order_by('-date').values('value')[:1]
+    
+    # update() no pasa por auto_now
+    return Investment.objects.filter(id__in=investment_ids).update(
+        current_amount=Subquery(latest_value),
+        updated_at=timezone.now(),
+    )
+
+
+def import_valuations(user, rows, batch_size=BATCH_SIZE):
+    start = time.perf_counter()
+    cleaned = clean_valuation_rows(user, rows)
+    if not cleaned:
+        return {'rows': 0, 'investments': 0}
+    
+    valuations = [
+        InvestmentValuation(investment_id=investment_id, date=row_date, value=value)
+        for (investment_id, row_date), value in cleaned.items()
+    ]
+    investment_ids = {investment_id for investment_id, _ in cleaned}
+    
+    with transaction.atomic():
+        InvestmentValuation.objects.bulk_create(
+            valuations,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['investment', 'date'],
+            update_fields=['value', 'updated_at'],
+        )
+        refresh_current_amounts(investment_ids)
+    
+    import_duration.observe(time.perf_counter() - start, kind='valuations')
+    import_rows.inc(len(valuations), kind='valuations')
+    logger.info('Imported %d valuations for %d investments (user=%s)', len(valuations), len(investment_ids), user.id)
+    
+    return {'rows': len(valuations), 'investments': len(investment_ids)}
@@ -1,12 +1,14 @@
-from rest_framework import viewsets
+from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Sum
+from django.utils import timezone
 
-from .models import Investment
+from .models import Investment, InvestmentValuation
 from .serializers import InvestmentSerializer
+from .valuations import ValuationImportError, import_valuations, parse_valuation_file
 
 
 class InvestmentViewSet(viewsets.ModelViewSet):
@@ -51,9 +53,32 @@ class InvestmentViewSet(viewsets.ModelViewSet):
         if new_value is not None:
             investment.current_amount = new_value
             investment.save()
+            InvestmentValuation.objects.update_or_create(
+                investment=investment,
+                date=timezone.now().date(),
+                defaults={'value': investment.current_amount}
+            )
             return Response(InvestmentSerializer(investment).data)
         
         return Response({'error': 'current_amount es requerido'}, status=400)
+    
+    @action(detail=False, methods=['post'])
+    def import_values(self, request):
+        upload = request.FILES.get('file')
+        try:
+            if upload:
+                rows = parse_valuation_file(upload, request.data.get('format'))
+            else:
+                rows = request.data.get('rows') if hasattr(request.data, 'get') else request.data
+            if not isinstance(rows, list):
+                return Response({'error': 'Se requiere un archivo o una lista de filas'}, status=status.HTTP_400_BAD_REQUEST)
+            result = import_valuations(request.user, rows)
+        except ValuationImportError as e:
+            return Response({'error': 'Importación inválida', 'details': e.errors[:100]}, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError as e:
+            return Response({'error': f'Archivo inválido: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(result)
 
 
 
@@ -0,0 +1,49 @@
+import math
+import statistics
+import time
+
+
+def percentile(samples, pct):
+    """Percentil por rango más cercano sobre una lista de muestras."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summarize(samples):
+    """Resumen en milisegundos de una lista de duraciones en segundos."""
+    return {
+        'n': len(samples),
+        'mean_ms': statistics.fmean(samples) * 1000 if samples else 0.0,
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p95_ms': percentile(samples, 95) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+        'max_ms': max(samples) * 1000 if samples else 0.0,
+    }
+
+
+def measure(func, iterations, warmup=0, before=None):
+    """Ejecuta ``func`` ``iterations`` veces y devuelve la duración de cada una."""
+    for _ in range(warmup):
+        if before:
+            before()
+        func()
+    
+    samples = []
+    for _ in range(iterations):
+        if before:
+            before()
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def format_row(label, summary):
+    return (
+        f'{label:<24} n={summary["n"]:<6} mean={summary["mean_ms"]:8.3f}ms '
+        f'p50={summary["p50_ms"]:8.3f}ms p95={summary["p95_ms"]:8.3f}ms '
+        f'p99={summary["p99_ms"]:8.3f}ms max={summary["max_ms"]:8.3f}ms'
+    )
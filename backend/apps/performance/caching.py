@@ -0,0 +1,12 @@
+from django.conf import settings
+
+# Backends cuyo contenido no ven los demás procesos
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache_is_shared(alias='default'):
+    """True si la caché la comparten todos los procesos (Redis, Memcached, base de datos...)."""
+    return settings.CACHES[alias]['BACKEND'] not in PROCESS_LOCAL_BACKENDS
@@ -0,0 +1,68 @@
+import gzip
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli es opcional
+    brotli = None
+
+re_accepts_br = _lazy_re_compile(r'\bbr\b')
+re_accepts_gzip = _lazy_re_compile(r'\bgzip\b')
+
+# Solo respuestas del API y del esquema OpenAPI. Las páginas HTML (admin, API
+# navegable) llevan el token CSRF y comprimirlas sin relleno aleatorio las
+# expondría a BREACH; para esas está GZipMiddleware de Django
+COMPRESSIBLE_TYPES = ('application/json', 'application/vnd.oai.openapi')
+
+
+class CompressionMiddleware:
+    """
+    Comprime respuestas con brotli (si está instalado y el cliente lo acepta)
+    o gzip, solo cuando superan COMPRESSION_MIN_SIZE bytes.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.gzip_level = getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6)
+        self.brotli_quality = getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 4)
+    
+    def __call__(self, request):
+        response = self.get_response(request)
+        
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+            return response
+        
+        patch_vary_headers(response, ('Accept-Encoding',))
+        
+        if len(response.content) < self.min_size:
+            return response
+        
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is not None and re_accepts_br.search(accept_encoding):
+            compressed = brotli.compress(response.content, quality=self.brotli_quality)
+            encoding = 'br'
+        elif re_accepts_gzip.search(accept_encoding):
+            compressed = gzip.compress(response.content, compresslevel=self.gzip_level, mtime=0)
+            encoding = 'gzip'
+        else:
+            return response
+        
+        if len(compressed) >= len(response.content):
+            return response
+        
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        
+        # Un ETag fuerte ya no corresponde al contenido comprimido
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        
+        return response
@@ -0,0 +1,200 @@
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('performance_request_metrics', default=None)
+_query_wrappers = ContextVar('performance_query_wrappers', default=())
+
+SIGNATURE_LENGTH = 200
+
+
+def _sample_rate():
+    return getattr(settings, 'PERF_SAMPLE_RATE', 0.0)
+
+
+def _duplicate_threshold():
+    return getattr(settings, 'PERF_DUPLICATE_THRESHOLD', 5)
+
+
+class RequestMetrics:
+    """Métricas acumuladas durante un request instrumentado."""
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished = None
+        self.queries = 0
+        self.sql_time = 0.0
+        self.signatures = Counter()
+        self.serializer_time = 0.0
+        # Las secciones del dashboard comparten estas métricas desde otros hilos
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper de Django: se invoca en cada consulta de la conexión
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.sql_time += elapsed
+                self.queries += 1
+                # El SQL llega con placeholders, así que la firma agrupa consultas
+                # iguales con distintos parámetros (patrón N+1)
+                self.signatures[sql[:SIGNATURE_LENGTH]] += 1
+    
+    def add_serializer_time(self, elapsed):
+        with self._lock:
+            self.serializer_time += elapsed
+    
+    def finish(self):
+        self.finished = time.perf_counter()
+    
+    @property
+    def total_time(self):
+        return (self.finished or time.perf_counter()) - self.started
+    
+    def duplicates(self, threshold=None):
+        threshold = threshold or _duplicate_threshold()
+        return [(signature, count) for signature, count in self.signatures.most_common() if count >= threshold]
+
+
+def current_metrics():
+    """Métricas del request en curso, o None si no se está instrumentando."""
+    return _current.get()
+
+
+def _install(stack, factories):
+    for factory in factories:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(factory(connection)))
+
+
+@contextmanager
+def wrap_queries(factory):
+    """
+    Instala ``factory(connection)`` como execute_wrapper en las conexiones del
+    hilo actual y lo registra en el contexto, para que los hilos auxiliares
+    que lo copian (secciones del dashboard) lo instalen en las suyas.
+    """
+    token = _query_wrappers.set(_query_wrappers.get() + (factory,))
+    try:
+        with ExitStack() as stack:
+            _install(stack, [factory])
+            yield
+    finally:
+        _query_wrappers.reset(token)
+
+
+@contextmanager
+def propagated_query_wrappers():
+    """En un hilo auxiliar: instala los wrappers del request que lo originó."""
+    with ExitStack() as stack:
+        _install(stack, _query_wrappers.get())
+        yield
+
+
+def _timed_serializer_data(fget):
+    def data(serializer):
+        metrics = _current.get()
+        if metrics is None:
+            return fget(serializer)
+        
+        # Solo se mide el serializer más externo de cada hilo para no contar dos veces
+        local = metrics._local
+        local.depth = getattr(local, 'depth', 0) + 1
+        start = time.perf_counter()
+        try:
+            return fget(serializer)
+        finally:
+            local.depth -= 1
+            if local.depth == 0:
+                metrics.add_serializer_time(time.perf_counter() - start)
+    
+    data._performance_timed = True
+    return data
+
+
+def install_serializer_timing():
+    """Envuelve ``BaseSerializer.data`` para medir el tiempo de serialización."""
+    from rest_framework.serializers import BaseSerializer
+    
+    prop = BaseSerializer.data
+    if getattr(prop.fget, '_performance_timed', False):
+        return
+    BaseSerializer.data = property(_timed_serializer_data(prop.fget), doc=prop.__doc__)
+
+
+def server_timing(metrics, size):
+    parts = [
+        f'app;dur={metrics.total_time * 1000:.1f}',
+        f'db;dur={metrics.sql_time * 1000:.1f};desc="{metrics.queries} queries"',
+        f'serialize;dur={metrics.serializer_time * 1000:.1f}',
+    ]
+    duplicates = metrics.duplicates()
+    if duplicates:
+        parts.append(f'dup;desc="{len(duplicates)} repeated"')
+    if size is not None:
+        parts.append(f'size;desc="{size}"')
+    return ', '.join(parts)
+
+
+class InstrumentationMiddleware:
+    """
+    Instrumenta una muestra de los requests (PERF_SAMPLE_RATE): cantidad y
+    tiempo de consultas SQL, consultas repetidas (posibles N+1), tiempo de
+    serialización y tamaño de la respuesta. Los resultados se exponen en el
+    header ``Server-Timing`` y en una línea de log por request.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install_serializer_timing()
+    
+    def __call__(self, request):
+        rate = _sample_rate()
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return self.get_response(request)
+        
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with wrap_queries(lambda connection: metrics):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+            metrics.finish()
+        
+        size = None if response.streaming else len(response.content)
+        response['Server-Timing'] = server_timing(metrics, size)
+        self.log(request, response, metrics, size)
+        return response
+    
+    def log(self, request, response, metrics, size):
+        logger.info(
+            'request method=%s path=%s status=%s total_ms=%.1f queries=%d sql_ms=%.1f serializer_ms=%.1f size=%s',
+            request.method, request.path, response.status_code, metrics.total_time * 1000,
+            metrics.queries, metrics.sql_time * 1000, metrics.serializer_time * 1000, size,
+            extra={
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'total_ms': round(metrics.total_time * 1000, 1),
+                'queries': metrics.queries,
+                'sql_ms': round(metrics.sql_time * 1000, 1),
+                'serializer_ms': round(metrics.serializer_time * 1000, 1),
+                'size': size,
+            },
+        )
+        for signature, count in metrics.duplicates():
+            logger.warning('repeated query path=%s count=%d sql=%s', request.path, count, signature)
@@ -0,0 +1,109 @@
+import json
+import logging
+from collections import Counter
+from contextvars import ContextVar
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_budget = ContextVar('log_budget', default=None)
+
+# Atributos propios de LogRecord; el resto viene de ``extra``
+RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JSONFormatter(logging.Formatter):
+    """Una línea JSON por registro, incluyendo los campos pasados en ``extra``."""
+    
+    def format(self, record):
+        payload = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        payload.update({key: value for key, value in record.__dict__.items() if key not in RESERVED_ATTRS})
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class RequestLogBudget:
+    def __init__(self, limit):
+        self.limit = limit
+        self.emitted = 0
+        self.suppressed = 0
+
+
+class LogBudgetFilter(logging.Filter):
+    """
+    Descarta los registros DEBUG/INFO de un request una vez agotado su
+    presupuesto (LOG_REQUEST_BUDGET). WARNING y superiores siempre pasan.
+    """
+    
+    def filter(self, record):
+        budget = _budget.get()
+        if budget is None or record.levelno >= logging.WARNING:
+            return True
+        budget.emitted += 1
+        if budget.emitted > budget.limit:
+            budget.suppressed += 1
+            return False
+        return True
+
+
+class LogBudgetMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        limit = getattr(settings, 'LOG_REQUEST_BUDGET', 0)
+        if not limit:
+            return self.get_response(request)
+        
+        budget = RequestLogBudget(limit)
+        token = _budget.set(budget)
+        try:
+            response = self.get_response(request)
+        finally:
+            _budget.reset(token)
+        
+        if budget.suppressed:
+            logger.warning(
+                'log budget exceeded path=%s budget=%d suppressed=%d',
+                request.path, budget.limit, budget.suppressed,
+            )
+        return response
+
+
+class SampledRows:
+    """
+    Envoltorio para mensajes por fila dentro de bucles: de cada mensaje se
+    registran las primeras ``first`` apariciones y luego una de cada ``every``.
+    Si el nivel está deshabilitado no se hace ningún trabajo.
+    """
+    
+    def __init__(self, logger, first=None, every=None):
+        self.logger = logger
+        self.first = first if first is not None else getattr(settings, 'LOG_ROW_SAMPLE_FIRST', 5)
+        self.every = every or getattr(settings, 'LOG_ROW_SAMPLE_EVERY', 100)
+        self.counts = Counter()
+    
+    def _log(self, level, msg, args):
+        if not self.logger.isEnabledFor(level):
+            return
+        self.counts[msg] += 1
+        count = self.counts[msg]
+        if count <= self.first or count % self.every == 0:
+            # stacklevel=3: el registro apunta a quien llamó a debug()/info()
+            self.logger.log(level, msg, *args, stacklevel=3)
+    
+    def log(self, level, msg, *args):
+        self._log(level, msg, args)
+    
+    def debug(self, msg, *args):
+        self._log(logging.DEBUG, msg, args)
+    
+    def info(self, msg, *args):
+        self._log(logging.INFO, msg, args)
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.performance.benchmarks import format_row
+from apps.performance.seeding import seed_user
+from apps.performance.suite import (
+    LATENCY_TOLERANCE, SIZES, default_baseline_path, find_regressions,
+    load_baseline, run_endpoints, save_baseline,
+)
+
+
+class Command(BaseCommand):
+    help = 'Mide consultas y latencia de todos los endpoints con usuarios sintéticos y compara contra la línea base'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--size', choices=SIZES, action='append', help='Volúmenes a medir (por defecto small y medium)')
+        parser.add_argument('--iterations', type=int, default=20, help='Requests medidos por endpoint')
+        parser.add_argument('--warmup', type=int, default=2, help='Requests descartados por endpoint')
+        parser.add_argument('--endpoint', action='append', help='Prefijo de los endpoints a medir (ej: reports)')
+        parser.add_argument('--baseline', default=None, help='Archivo JSON con la línea base')
+        parser.add_argument('--update-baseline', action='store_true', help='Guarda los resultados como nueva línea base')
+        parser.add_argument('--tolerance', type=float, default=LATENCY_TOLERANCE, help='Aumento de p95 tolerado (0.25 = 25%%)')
+    
+    def handle(self, *args, **options):
+        sizes = options['size'] or ['small', 'medium']
+        baseline_path = options['baseline'] or default_baseline_path()
+        try:
+            baseline = load_baseline(baseline_path, required=not options['update_baseline'])
+        except FileNotFoundError:
+            raise CommandError(f'No existe la línea base {baseline_path}; créela con --update-baseline')
+        regressions = []
+        
+        for size in sizes:
+            self.stdout.write(f'Preparando usuario {size} ({SIZES[size]} transacciones)...')
+            user = seed_user(f'bench-{size}@bench.local', SIZES[size])
+            
+            results = run_endpoints(user, options['iterations'], options['warmup'], options['endpoint'])
+            for name, result in results.items():
+                self.stdout.write(f'{format_row(name, result)} q={result["queries"]:<4} status={result["status"]}')
+            
+            if options['update_baseline']:
+                baseline.setdefault(size, {}).update(results)
+            else:
+                regressions += [
+                    f'[{size}] {message}'
+                    for message in find_regressions(results, baseline.get(size, {}), options['tolerance'])
+                ]
+        
+        if options['update_baseline']:
+            save_baseline(baseline_path, baseline)
+            self.stdout.write(self.style.SUCCESS(f'Línea base guardada en {baseline_path}'))
+            return
+        
+        if regressions:
+            for message in regressions:
+                self.stderr.write(message)
+            raise CommandError(f'{len(regressions)} regresiones de rendimiento')
+        
+        self.stdout.write(self.style.SUCCESS('Sin regresiones respecto a la línea base'))
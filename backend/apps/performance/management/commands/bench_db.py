@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.performance.benchmarks import format_row, measure, summarize
+
+MODES = ('new', 'persistent')
+
+
+class Command(BaseCommand):
+    help = 'Mide la latencia (p50/p99) de una consulta simple con conexión nueva o persistente (contra pgbouncer, "new" mide el pool)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=500, help='Requests simulados por modo')
+        parser.add_argument('--warmup', type=int, default=20, help='Iteraciones descartadas al inicio')
+        parser.add_argument('--database', default='default', help='Alias de la base de datos')
+        parser.add_argument('--query', default='SELECT 1', help='Consulta ejecutada en cada request')
+        parser.add_argument('--mode', choices=MODES, action='append', help='Modos a medir (por defecto todos los disponibles)')
+    
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        modes = options['mode'] or list(MODES)
+        
+        def run_query():
+            with connection.cursor() as cursor:
+                cursor.execute(options['query'])
+                cursor.fetchall()
+        
+        self.stdout.write(f'Base de datos: {options["database"]} ({connection.settings_dict["HOST"]}), consulta: {options["query"]}')
+        
+        for mode in modes:
+            if mode == 'persistent':
+                # La conexión se abre una vez y se reutiliza entre requests
+                before = connection.ensure_connection
+            else:
+                # Cada request abre su conexión
+                before = connection.close
+            
+            samples = measure(run_query, options['iterations'], warmup=options['warmup'], before=before)
+            self.stdout.write(format_row(mode, summarize(samples)))
+        
+        connection.close()
+        self.stdout.write(self.style.SUCCESS('Benchmark finalizado'))
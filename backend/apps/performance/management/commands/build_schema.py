@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.performance.schema import write_schema_files
+
+
+class Command(BaseCommand):
+    help = 'Genera el esquema OpenAPI (YAML y JSON) que sirve /api/schema/; ejecutar en cada deploy'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', default=None, help='Directorio de salida (por defecto SCHEMA_DIR)')
+    
+    def handle(self, *args, **options):
+        for path in write_schema_files(options['output_dir']):
+            self.stdout.write(f'  {path}')
+        self.stdout.write(self.style.SUCCESS('Esquema OpenAPI generado'))
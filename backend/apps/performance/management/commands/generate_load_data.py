@@ -0,0 +1,68 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from apps.categories.management.commands.seed_data import Command as SeedDataCommand
+from apps.performance.seeding import CHUNK_SIZE, PASSWORD, generate_users
+
+
+class Command(BaseCommand):
+    help = 'Genera usuarios sintéticos con años de movimientos para pruebas de carga y capacidad'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='Cantidad de usuarios')
+        parser.add_argument('--transactions', type=int, default=1000, help='Transacciones promedio por usuario')
+        parser.add_argument('--years', type=float, default=2, help='Años de historia')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Procesos en paralelo')
+        parser.add_argument('--users-per-task', type=int, default=10, help='Usuarios que genera cada tarea del pool')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Filas por bulk_create')
+        parser.add_argument('--prefix', default='load', help='Prefijo de los usuarios (<prefix>-N@load.local)')
+        parser.add_argument('--seed', type=int, default=0, help='Semilla para datos reproducibles')
+    
+    def handle(self, *args, **options):
+        users = options['users']
+        if users < 1 or options['workers'] < 1 or options['users_per_task'] < 1:
+            raise CommandError('--users, --workers y --users-per-task deben ser mayores que cero')
+        
+        self.stdout.write('Creando categorías predeterminadas...')
+        SeedDataCommand().create_default_categories()
+        
+        # Hashear una sola vez: PBKDF2 por usuario dominaría el tiempo total
+        password = make_password(PASSWORD)
+        step = options['users_per_task']
+        tasks = [
+            (options['prefix'], start, min(start + step, users), options['transactions'], options['years'],
+             options['seed'], password, options['chunk_size'])
+            for start in range(0, users, step)
+        ]
+        
+        self.stdout.write(
+            f'Generando {users} usuarios (~{users * options["transactions"]} transacciones) '
+            f'con {options["workers"]} procesos...'
+        )
+        # Los procesos hijos no deben heredar conexiones abiertas del padre
+        connections.close_all()
+        
+        started = time.monotonic()
+        created = 0
+        done = 0
+        with ProcessPoolExecutor(max_workers=options['workers'], mp_context=get_context('fork')) as pool:
+            futures = [pool.submit(generate_users, *task) for task in tasks]
+            for future in as_completed(futures):
+                created += future.result()
+                done += 1
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f'  {done}/{len(tasks)} tareas, {created} transacciones, '
+                    f'{created / elapsed if elapsed else 0:,.0f} tx/s'
+                )
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'{created} transacciones generadas en {time.monotonic() - started:.1f}s '
+            f'(contraseña de los usuarios: {PASSWORD})'
+        ))
@@ -0,0 +1,219 @@
+"""
+Métricas en formato de exposición de Prometheus, sin dependencias externas.
+
+Cada proceso acumula sus métricas en memoria. Con ``PROMETHEUS_MULTIPROC_DIR``
+definido (varios workers de gunicorn), cada proceso vuelca periódicamente su
+estado a un archivo JSON propio en ese directorio y ``/metrics`` suma los de
+todos los procesos. El directorio debe vaciarse al arrancar el servidor.
+"""
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+NAMESPACE = 'finanzas'
+FLUSH_INTERVAL = 1.0
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def multiprocess_dir():
+    return os.environ.get('PROMETHEUS_MULTIPROC_DIR') or None
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+        self._last_flush = 0.0
+        self._started = time.time_ns()
+    
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+    
+    def snapshot(self):
+        """Estado serializable del proceso: ``{nombre: [[labels, valor], ...]}``."""
+        with self.lock:
+            return {
+                name: [[list(labels), value if not isinstance(value, list) else list(value)] for labels, value in metric.values.items()]
+                for name, metric in self.metrics.items()
+            }
+    
+    def _path(self, directory):
+        return os.path.join(directory, f'metrics_{os.getpid()}_{self._started}.json')
+    
+    def flush(self, force=False):
+        directory = multiprocess_dir()
+        if not directory:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < FLUSH_INTERVAL:
+            return
+        self._last_flush = now
+        
+        path = self._path(directory)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as fh:
+            json.dump(self.snapshot(), fh)
+        os.replace(tmp_path, path)
+    
+    def collect(self):
+        """Suma el estado de todos los procesos (o solo el propio sin directorio)."""
+        snapshots = [self.snapshot()]
+        directory = multiprocess_dir()
+        if directory and os.path.isdir(directory):
+            own = os.path.basename(self._path(directory))
+            for filename in os.listdir(directory):
+                if not filename.endswith('.json') or filename == own:
+                    continue
+                try:
+                    with open(os.path.join(directory, filename)) as fh:
+                        snapshots.append(json.load(fh))
+                except (OSError, ValueError):
+                    continue
+        
+        merged = {}
+        for snapshot in snapshots:
+            for name, samples in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                values = merged.setdefault(name, {})
+                for labels, value in samples:
+                    key = tuple(labels)
+                    values[key] = metric.merge(values.get(key), value)
+        return merged
+    
+    def render(self):
+        merged = self.collect()
+        lines = []
+        for name, metric in sorted(self.metrics.items()):
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for labels, value in sorted(merged.get(name, {}).items()):
+                lines.extend(metric.samples(labels, value))
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = None
+    
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = f'{NAMESPACE}_{name}'
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.registry = registry
+        registry.register(self)
+    
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(Metric):
+    kind = 'counter'
+    
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+    
+    def merge(self, current, value):
+        return (current or 0) + value
+    
+    def samples(self, labels, value):
+        return [f'{self.name}{_format_labels(zip(self.labelnames, labels))} {_format_value(value)}']
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+    
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(buckets) if buckets[-1] == math.inf else tuple(buckets) + (math.inf,)
+    
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            # Conteos por bucket (no acumulados), luego suma y cantidad
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+    
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+    
+    def merge(self, current, value):
+        if current is None:
+            return list(value)
+        return [a + b for a, b in zip(current, value)]
+    
+    def samples(self, labels, value):
+        pairs = list(zip(self.labelnames, labels))
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, value):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{_format_labels(pairs + [("le", _format_value(float(bound)))])} {cumulative}')
+        lines.append(f'{self.name}_sum{_format_labels(pairs)} {_format_value(float(value[-2]))}')
+        lines.append(f'{self.name}_count{_format_labels(pairs)} {value[-1]}')
+        return lines
+
+
+http_requests = Counter('http_requests_total', 'Requests atendidos por vista, método y estado.', ['view', 'method', 'status'])
+http_request_duration = Histogram('http_request_duration_seconds', 'Latencia de los requests por vista.', ['view', 'method'])
+db_queries = Counter('db_queries_total', 'Consultas SQL ejecutadas durante requests.', ['alias'])
+db_query_seconds = Counter('db_query_seconds_total', 'Tiempo acumulado de las consultas SQL durante requests.', ['alias'])
+cache_requests = Counter('cache_requests_total', 'Lecturas de caché por uso y resultado (hit/miss).', ['cache', 'result'])
+job_duration = Histogram(
+    'job_duration_seconds', 'Duración de los procesos programados.', ['job'],
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0),
+)
+job_items = Counter('job_items_total', 'Elementos procesados por los procesos programados.', ['job'])
+import_rows = Counter('import_rows_total', 'Filas importadas por tipo de importación.', ['kind'])
+import_duration = Histogram('import_duration_seconds', 'Duración de las importaciones.', ['kind'])
+transactions_written = Counter('transactions_written_total', 'Transacciones creadas (usar rate() para transacciones por segundo).')
+
+
+def record_cache(cache, hit):
+    cache_requests.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+if multiprocess_dir():
+    atexit.register(REGISTRY.flush, True)
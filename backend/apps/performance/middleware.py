@@ -0,0 +1,76 @@
+import time
+
+from config.routers import read_only_request, route_reads_to_replica
+
+from . import metrics
+from .instrumentation import wrap_queries
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+READ_ONLY_ACTIONS = {'list', 'retrieve', 'summary', 'statistics'}
+READ_ONLY_MODULES = ('apps.reports.',)
+
+
+def is_read_only_view(request, view_func):
+    if request.method not in SAFE_METHODS:
+        return False
+    
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is not None and view_class.__module__.startswith(READ_ONLY_MODULES):
+        return True
+    
+    # ViewSets: as_view() guarda el mapeo método -> acción en view_func.actions
+    actions = getattr(view_func, 'actions', None) or {}
+    return actions.get(request.method.lower()) in READ_ONLY_ACTIONS
+
+
+class ReplicaRoutingMiddleware:
+    """Marca los requests de solo lectura para que el router use la réplica."""
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        # Estado limpio por request; process_view corre dentro de este contexto
+        with read_only_request(False):
+            return self.get_response(request)
+    
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if is_read_only_view(request, view_func):
+            route_reads_to_replica()
+        return None
+
+
+def _view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unmatched>'
+    return match.view_name or match._func_path
+
+
+def _query_counter(alias):
+    def wrapper(execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            metrics.db_queries.inc(alias=alias)
+            metrics.db_query_seconds.inc(time.perf_counter() - start, alias=alias)
+    return wrapper
+
+
+class MetricsMiddleware:
+    """Latencia por vista y consultas SQL por request para ``/metrics``."""
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        start = time.perf_counter()
+        with wrap_queries(lambda connection: _query_counter(connection.alias)):
+            response = self.get_response(request)
+        
+        view = _view_label(request)
+        metrics.http_request_duration.observe(time.perf_counter() - start, view=view, method=request.method)
+        metrics.http_requests.inc(view=view, method=request.method, status=response.status_code)
+        metrics.REGISTRY.flush()
+        return response
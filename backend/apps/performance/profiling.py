@@ -0,0 +1,185 @@
+import cProfile
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+
+PROFILE_SUFFIX = '.prof'
+NAME_RE = re.compile(r'^[\w.-]+\.prof$')
+MAX_DEPTH = 64
+MAX_SAMPLES = 100_000
+
+# cProfile no admite dos perfiles activos a la vez desde Python 3.12
+_active = threading.Lock()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class ProfileStore:
+    """Buffer circular de perfiles en disco: conserva los ``max_files`` más recientes."""
+    
+    def __init__(self, directory=None, max_files=None):
+        self.directory = Path(directory or _setting('PROFILE_DIR', Path(settings.BASE_DIR) / 'profiles'))
+        self.max_files = max_files or _setting('PROFILE_MAX_FILES', 50)
+    
+    def _files(self):
+        if not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob(f'*{PROFILE_SUFFIX}'), key=lambda path: path.stat().st_mtime)
+    
+    def save(self, profiler, request, elapsed):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r'[^\w]+', '-', request.path).strip('-')[:60] or 'root'
+        name = f'{datetime.now():%Y%m%d-%H%M%S-%f}_{request.method}_{slug}_{int(elapsed * 1000)}ms{PROFILE_SUFFIX}'
+        profiler.dump_stats(self.directory / name)
+        
+        files = self._files()
+        for path in files[:max(0, len(files) - self.max_files)]:
+            path.unlink(missing_ok=True)
+        return name
+    
+    def list(self):
+        return [
+            {'name': path.name, 'size': path.stat().st_size, 'created': datetime.fromtimestamp(path.stat().st_mtime)}
+            for path in reversed(self._files())
+        ]
+    
+    def path(self, name):
+        """Ruta del perfil, o None si el nombre no es válido o no existe."""
+        if not NAME_RE.match(name):
+            return None
+        path = self.directory / name
+        return path if path.is_file() else None
+
+
+def _function_name(func):
+    filename, line, name = func
+    return name if filename == '~' else f'{name} ({os.path.basename(filename)}:{line})'
+
+
+def to_speedscope(path, name=None):
+    """
+    Convierte un perfil pstats al formato de speedscope. cProfile solo guarda
+    pares llamador → llamado, así que las pilas se reconstruyen desde las raíces
+    repartiendo el tiempo de cada función entre sus llamadores.
+    """
+    stats = pstats.Stats(str(path)).stats
+    frames = []
+    frame_index = {}
+    samples = []
+    weights = []
+    
+    def frame(func):
+        if func not in frame_index:
+            frame_index[func] = len(frames)
+            filename, line, _ = func
+            frames.append({'name': _function_name(func), 'file': filename, 'line': line})
+        return frame_index[func]
+    
+    callees = {}
+    for func, (_, _, _, cumulative, callers) in stats.items():
+        for caller, caller_stats in callers.items():
+            # caller_stats = (cc, nc, tt, ct) de func cuando lo llama caller
+            share = caller_stats[3] / cumulative if cumulative else 0
+            callees.setdefault(caller, []).append((func, share))
+    
+    def walk(func, stack, fraction, depth):
+        own_time = stats[func][2] * fraction
+        stack = stack + [frame(func)]
+        if own_time > 0:
+            samples.append(stack)
+            weights.append(own_time)
+        if depth >= MAX_DEPTH or len(samples) >= MAX_SAMPLES:
+            return
+        for callee, share in callees.get(func, []):
+            if frame_index.get(callee) in stack:
+                continue
+            if fraction * share * stats[callee][3] > 1e-6:
+                walk(callee, stack, fraction * share, depth + 1)
+    
+    roots = [func for func, data in stats.items() if not data[4]]
+    for root in roots:
+        walk(root, [], 1.0, 0)
+    
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled',
+            'name': name or Path(path).name,
+            'unit': 'seconds',
+            'startValue': 0,
+            'endValue': sum(weights),
+            'samples': samples,
+            'weights': weights,
+        }],
+        'name': name or Path(path).name,
+        'exporter': 'finanzas',
+    }
+
+
+def _forced(request):
+    """El header de perfilado solo se respeta para usuarios staff."""
+    header = _setting('PROFILE_HEADER', 'X-Profile')
+    if not request.headers.get(header):
+        return False
+    
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+    
+    from rest_framework.exceptions import AuthenticationFailed
+    
+    from apps.users.authentication import CachedJWTAuthentication
+    
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return bool(result and result[0].is_staff)
+
+
+class ProfilingMiddleware:
+    """
+    Perfila con cProfile una muestra de los requests (PROFILE_SAMPLE_RATE) y
+    guarda el perfil solo si superan PROFILE_THRESHOLD_MS. Un usuario staff
+    puede forzar el perfil de un request con el header ``X-Profile: 1``.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.store = ProfileStore()
+    
+    def __call__(self, request):
+        forced = _forced(request)
+        rate = _setting('PROFILE_SAMPLE_RATE', 0.0)
+        if not forced and (rate <= 0 or random.random() >= rate):
+            return self.get_response(request)
+        if not _active.acquire(blocking=False):
+            return self.get_response(request)
+        
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        finally:
+            _active.release()
+        elapsed = time.perf_counter() - start
+        
+        if forced or elapsed * 1000 >= _setting('PROFILE_THRESHOLD_MS', 1000):
+            name = self.store.save(profiler, request, elapsed)
+            if forced:
+                response['X-Profile-Id'] = name
+        return response
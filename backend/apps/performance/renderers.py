@@ -0,0 +1,55 @@
+import datetime
+import decimal
+import uuid
+
+from django.utils.functional import Promise
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+
+def _default(obj):
+    """Tipos que orjson no serializa de forma nativa, con el mismo criterio que el JSONEncoder de DRF."""
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, Promise):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, '__iter__'):
+        return list(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer basado en orjson cuando está instalado; si no, usa el
+    renderer estándar de DRF. Los tipos se serializan con el criterio de DRF,
+    salvo los datetime, que orjson emite con microsegundos en lugar de
+    milisegundos (los serializers de DRF ya entregan las fechas como texto).
+    """
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        if data is None:
+            return b''
+        
+        options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        
+        return orjson.dumps(data, default=_default, option=options)
@@ -0,0 +1,108 @@
+import hashlib
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import require_GET
+
+FORMATS = {
+    'yaml': ('openapi.yaml', 'application/vnd.oai.openapi; charset=utf-8'),
+    'json': ('openapi.json', 'application/vnd.oai.openapi+json'),
+}
+CACHE_TIMEOUT = None
+
+_schemas = {}
+_lock = threading.Lock()
+
+
+def schema_dir():
+    return Path(getattr(settings, 'SCHEMA_DIR', Path(settings.BASE_DIR) / 'schema'))
+
+
+def generate_schema(fmt):
+    """Genera el esquema OpenAPI completo; cuesta del orden de un segundo de CPU."""
+    from drf_spectacular.generators import SchemaGenerator
+    from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+    
+    schema = SchemaGenerator().get_schema(request=None, public=True)
+    renderer = OpenApiJsonRenderer() if fmt == 'json' else OpenApiYamlRenderer()
+    return renderer.render(schema, renderer_context={})
+
+
+def write_schema_files(directory=None):
+    directory = Path(directory or schema_dir())
+    directory.mkdir(parents=True, exist_ok=True)
+    written = []
+    for fmt, (filename, _) in FORMATS.items():
+        path = directory / filename
+        path.write_bytes(generate_schema(fmt))
+        written.append(path)
+    return written
+
+
+def _etag(content):
+    return '"%s"' % hashlib.sha256(content).hexdigest()[:32]
+
+
+def get_schema(fmt):
+    """
+    ``(contenido, etag)`` del esquema. Se usa el archivo generado en el deploy
+    (``build_schema``) si existe; si no, se genera una vez por proceso y se
+    comparte por caché bajo la versión del código (APP_VERSION).
+    """
+    cached = _schemas.get(fmt)
+    if cached is not None:
+        return cached
+    
+    with _lock:
+        cached = _schemas.get(fmt)
+        if cached is not None:
+            return cached
+        
+        path = schema_dir() / FORMATS[fmt][0]
+        if path.is_file():
+            content = path.read_bytes()
+        else:
+            version = getattr(settings, 'APP_VERSION', '')
+            key = f'schema:{version}:{fmt}'
+            content = cache.get(key) if version else None
+            if content is None:
+                content = generate_schema(fmt)
+                if version:
+                    cache.set(key, content, CACHE_TIMEOUT)
+        
+        cached = _schemas[fmt] = (content, _etag(content))
+        return cached
+
+
+def _requested_format(request):
+    fmt = request.GET.get('format')
+    if fmt in FORMATS:
+        return fmt
+    return 'json' if 'json' in request.headers.get('Accept', '') else 'yaml'
+
+
+def _matches(request, etag):
+    header = request.headers.get('If-None-Match', '')
+    # La compresión convierte el ETag en débil (W/"..."); se compara sin el prefijo
+    candidates = {value.strip().removeprefix('W/') for value in header.split(',')}
+    return etag in candidates or '*' in candidates
+
+
+@require_GET
+def schema_view(request):
+    """Esquema OpenAPI precalculado con ETag; los clientes revalidan con If-None-Match."""
+    fmt = _requested_format(request)
+    content, etag = get_schema(fmt)
+    
+    if _matches(request, etag):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(content, content_type=FORMATS[fmt][1])
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    patch_vary_headers(response, ('Accept',))
+    return response
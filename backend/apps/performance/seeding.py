@@ -0,0 +1,361 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+CHUNK_SIZE = 5000
+PASSWORD = 'bench1234'
+
+EXPENSE_TREE = {
+    'Alimentación': ['Supermercado', 'Restaurantes', 'Delivery'],
+    'Transporte': ['Combustible', 'Transporte público', 'Taxi'],
+    'Hogar': ['Arriendo', 'Servicios básicos', 'Mantención'],
+    'Ocio': ['Streaming', 'Salidas', 'Viajes'],
+}
+INCOME_CATEGORIES = ['Sueldo', 'Honorarios']
+SECONDARY_CATEGORIES = ['Trabajo', 'Familia', 'Vacaciones', 'Mascota', 'Regalos']
+ITEM_NAMES = ['Pan', 'Leche', 'Café', 'Fruta', 'Detergente', 'Bebida', 'Snack', 'Carne', 'Arroz', 'Queso']
+
+
+def chunked(iterable, size=CHUNK_SIZE):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def create_accounts(user, rng):
+    """Entre dos y cinco cuentas: siempre efectivo y banco, a veces tarjeta y ahorro en USD."""
+    from apps.accounts.models import Account
+    
+    accounts = [
+        Account(user=user, name='Efectivo', account_type='efectivo', balance=Decimal(rng.randint(10, 300) * 1000)),
+        Account(user=user, name='Banco', account_type='banco', balance=Decimal(rng.randint(500, 5000) * 1000)),
+    ]
+    if rng.random() < 0.7:
+        accounts.append(Account(user=user, name='Tarjeta', account_type='credito', balance=Decimal(-rng.randint(0, 800) * 1000)))
+    if rng.random() < 0.4:
+        accounts.append(Account(user=user, name='Ahorro', account_type='banco', balance=Decimal(rng.randint(1000, 20000) * 1000)))
+    if rng.random() < 0.2:
+        accounts.append(Account(user=user, name='Cuenta USD', account_type='banco', currency='USD', balance=Decimal(rng.randint(100, 5000))))
+    return Account.objects.bulk_create(accounts)
+
+
+def create_categories(user):
+    """Árbol de categorías propio del usuario; devuelve ``(gastos, gastos_hoja, ingresos, secundarias)``."""
+    from apps.categories.cache import invalidate_categories
+    from apps.categories.models import Category, SecondaryCategory
+    
+    parents = Category.objects.bulk_create([
+        Category(user=user, name=name, category_type='gasto') for name in EXPENSE_TREE
+    ])
+    leaves = Category.objects.bulk_create([
+        Category(user=user, name=child, category_type='gasto', parent=parent)
+        for parent in parents
+        for child in EXPENSE_TREE[parent.name]
+    ])
+    incomes = Category.objects.bulk_create([
+        Category(user=user, name=name, category_type='ingreso') for name in INCOME_CATEGORIES
+    ])
+    secondary = SecondaryCategory.objects.bulk_create([
+        SecondaryCategory(user=user, name=name) for name in SECONDARY_CATEGORIES
+    ])
+    # bulk_create no emite post_save
+    invalidate_categories(user.id)
+    return parents, leaves, incomes, secondary
+
+
+def _expense_amount(rng, ant):
+    if ant:
+        return Decimal(rng.randint(5, 50) * 100)
+    # Distribución log-normal: muchos gastos medianos y pocos muy altos
+    return Decimal(int(rng.lognormvariate(9.5, 1.0)) // 10 * 10 + 10)
+
+
+def generate_transactions(user, accounts, expense_categories, income_categories, secondary, count, years, rng, chunk_size=CHUNK_SIZE):
+    """
+    Inserta ``count`` transacciones repartidas en los últimos ``years`` años,
+    con ítems de compra y categorías secundarias, en lotes de ``chunk_size``.
+    No pasa por ``Transaction.save``: los saldos de las cuentas no se recalculan.
+    """
+    from apps.transactions.models import PurchaseItem, Transaction
+    from apps.transactions.reporting import PurchaseItemTag, TransactionTag
+    
+    today = date.today()
+    days = max(1, int(365 * years))
+    
+    def build(_):
+        roll = rng.random()
+        account = rng.choice(accounts)
+        when = today - timedelta(days=rng.randrange(days))
+        if roll < 0.80:
+            ant = rng.random() < 0.15
+            return Transaction(
+                user=user, transaction_type='gasto', account=account, date=when,
+                amount=_expense_amount(rng, ant), category=rng.choice(expense_categories),
+                description='Gasto', is_ant_expense=ant,
+            )
+        if roll < 0.94:
+            return Transaction(
+                user=user, transaction_type='ingreso', account=account, date=when,
+                amount=Decimal(rng.randint(200, 3000) * 1000), category=rng.choice(income_categories),
+                description='Ingreso',
+            )
+        destination = rng.choice([a for a in accounts if a.id != account.id] or accounts)
+        return Transaction(
+            user=user, transaction_type='transferencia', account=account, destination_account=destination,
+            date=when, amount=Decimal(rng.randint(10, 500) * 1000), description='Transferencia',
+        )
+    
+    created = 0
+    for chunk in chunked(map(build, range(count)), chunk_size):
+        with transaction.atomic():
+            Transaction.objects.bulk_create(chunk, batch_size=chunk_size)
+            
+            items = []
+            for tx in chunk:
+                # Una de cada cuatro compras se detalla en ítems
+                if tx.transaction_type != 'gasto' or rng.random() >= 0.25:
+                    continue
+                for _ in range(rng.randint(1, 5)):
+                    items.append(PurchaseItem(
+                        transaction=tx, name=rng.choice(ITEM_NAMES), quantity=rng.randint(1, 3),
+                        amount=_expense_amount(rng, tx.is_ant_expense), category=rng.choice(expense_categories),
+                        is_ant_expense=tx.is_ant_expense,
+                    ))
+            PurchaseItem.objects.bulk_create(items, batch_size=chunk_size)
+            
+            if secondary:
+                TransactionTag.objects.bulk_create([
+                    TransactionTag(transaction_id=tx.id, secondarycategory_id=rng.choice(secondary).id)
+                    for tx in chunk if rng.random() < 0.10
+                ], batch_size=chunk_size)
+                PurchaseItemTag.objects.bulk_create([
+                    PurchaseItemTag(purchaseitem_id=item.id, secondarycategory_id=rng.choice(secondary).id)
+                    for item in items if rng.random() < 0.10
+                ], batch_size=chunk_size)
+        created += len(chunk)
+    return created
+
+
+def create_recurring(user, accounts, expense_categories, income_categories, rng):
+    from apps.transactions.models import RecurringTransaction
+    
+    today = date.today()
+    rules = [
+        RecurringTransaction(
+            user=user, transaction_type='ingreso', amount=Decimal(rng.randint(500, 3000) * 1000),
+            description='Sueldo', account=accounts[1], category=income_categories[0], frequency='mensual',
+            start_date=today.replace(day=1) - timedelta(days=365), next_execution=today.replace(day=1) + timedelta(days=31),
+        )
+    ]
+    for description in rng.sample(['Arriendo', 'Internet', 'Gimnasio', 'Streaming', 'Seguro', 'Colegio'], rng.randint(1, 4)):
+        rules.append(RecurringTransaction(
+            user=user, transaction_type='gasto', amount=Decimal(rng.randint(5, 600) * 1000), description=description,
+            account=rng.choice(accounts), category=rng.choice(expense_categories),
+            frequency=rng.choice(['mensual', 'mensual', 'mensual', 'semanal', 'anual']),
+            start_date=today - timedelta(days=rng.randint(30, 720)),
+            next_execution=today + timedelta(days=rng.randint(0, 30)),
+            is_active=rng.random() < 0.9,
+        ))
+    return RecurringTransaction.objects.bulk_create(rules)
+
+
+def create_budgets(user, categories, rng):
+    from apps.budgets.models import Budget
+    
+    start = date.today().replace(day=1)
+    return Budget.objects.bulk_create([
+        Budget(
+            user=user, category=category, amount_limit=Decimal(rng.randint(50, 800) * 1000),
+            period=rng.choice(['mensual', 'mensual', 'semanal', 'anual']), start_date=start,
+            alert_threshold=rng.choice([70, 80, 90]),
+        )
+        for category in rng.sample(categories, rng.randint(1, len(categories)))
+    ])
+
+
+def create_goals(user, categories, rng):
+    from apps.goals.models import Goal
+    
+    today = date.today()
+    goals = [
+        Goal(
+            user=user, name='Fondo de emergencia', goal_type='savings',
+            target_amount=Decimal(rng.randint(1000, 10000) * 1000), target_date=today + timedelta(days=rng.randint(90, 720)),
+        )
+    ]
+    if rng.random() < 0.5:
+        goals.append(Goal(
+            user=user, name='Gastar menos', goal_type='category_reduction', category=rng.choice(categories),
+            target_amount=Decimal(rng.randint(50, 300) * 1000), target_date=today + timedelta(days=rng.randint(30, 180)),
+            reduction_percentage=Decimal(rng.choice([10, 15, 20, 25])), baseline_amount=Decimal(rng.randint(100, 600) * 1000),
+        ))
+    return Goal.objects.bulk_create(goals)
+
+
+def create_debts(user, accounts, years, rng):
+    """Deudas y préstamos con sus pagos; ``paid_amount`` se calcula aquí porque bulk_create no llama a ``save``."""
+    from apps.debts.models import Debt, DebtPayment
+    
+    today = date.today()
+    debts = []
+    payments = []
+    for _ in range(rng.choice([0, 1, 1, 2, 3])):
+        total = Decimal(rng.randint(100, 20000) * 1000)
+        start = today - timedelta(days=rng.randint(30, max(31, int(365 * years))))
+        amounts = [(total / 24).quantize(Decimal('1')) for _ in range(rng.randint(0, 24))]
+        paid = sum(amounts, Decimal('0'))
+        debt = Debt(
+            user=user, name=rng.choice(['Crédito de consumo', 'Préstamo familiar', 'Crédito automotriz', 'Avance en cuotas']),
+            debt_type=rng.choice(['deuda', 'deuda', 'prestamo']), total_amount=total, paid_amount=paid,
+            interest_rate=Decimal(rng.randint(0, 300)) / 10, start_date=start, due_date=start + timedelta(days=730),
+            account=rng.choice(accounts), is_paid=paid >= total,
+        )
+        debts.append(debt)
+        payments.append([(amount, start + timedelta(days=30 * (n + 1))) for n, amount in enumerate(amounts)])
+    
+    Debt.objects.bulk_create(debts)
+    DebtPayment.objects.bulk_create([
+        DebtPayment(debt=debt, amount=amount, payment_date=when)
+        for debt, debt_payments in zip(debts, payments)
+        for amount, when in debt_payments
+    ])
+    return debts
+
+
+def create_bets(user, accounts, years, rng):
+    from apps.bets.models import Bet
+    
+    # La mayoría de los usuarios no apuesta; los que lo hacen registran varias
+    if rng.random() >= 0.2:
+        return []
+    
+    today = date.today()
+    bets = []
+    for _ in range(rng.randint(5, 200)):
+        amount = Decimal(rng.randint(1, 50) * 1000)
+        odds = Decimal(rng.randint(110, 500)) / 100
+        result = rng.choices(['ganó', 'perdió', 'pendiente'], weights=[40, 55, 5])[0]
+        bet_type = rng.choice(['deportes', 'deportes', 'deportes', 'poker', 'ruleta', 'tragamonedas'])
+        bets.append(Bet(
+            user=user, bet_type=bet_type, event_name='Apuesta', bet_amount=amount, odds=odds, result=result,
+            sport_type='futbol' if bet_type == 'deportes' else None,
+            payout_amount=(amount * odds).quantize(Decimal('1')) if result == 'ganó' else Decimal('0'),
+            account=rng.choice(accounts), date=today - timedelta(days=rng.randrange(max(1, int(365 * years)))),
+        ))
+    return Bet.objects.bulk_create(bets)
+
+
+def create_fixtures(user, years, rng):
+    """
+    Todo menos las transacciones: cuentas, categorías, recurrentes,
+    presupuestos, metas, deudas y apuestas. Devuelve lo que necesita
+    ``generate_transactions``: ``(cuentas, gastos_hoja, ingresos, secundarias)``.
+    """
+    accounts = create_accounts(user, rng)
+    parents, expense_categories, income_categories, secondary = create_categories(user)
+    create_recurring(user, accounts, expense_categories, income_categories, rng)
+    create_budgets(user, parents, rng)
+    create_goals(user, parents, rng)
+    create_debts(user, accounts, years, rng)
+    create_bets(user, accounts, years, rng)
+    return accounts, expense_categories, income_categories, secondary
+
+
+def load_fixtures(user):
+    """Lo mismo que devuelve ``create_fixtures``, leído de un usuario ya creado."""
+    from apps.accounts.models import Account
+    from apps.categories.models import Category, SecondaryCategory
+    
+    categories = Category.objects.filter(user=user).order_by('id')
+    return (
+        list(Account.objects.filter(user=user).order_by('id')),
+        list(categories.filter(category_type='gasto', parent__isnull=False)),
+        list(categories.filter(category_type='ingreso')),
+        list(SecondaryCategory.objects.filter(user=user).order_by('id')),
+    )
+
+
+def populate_user(user, transactions, years, rng, chunk_size=CHUNK_SIZE):
+    """Genera todos los datos financieros de un usuario ya creado."""
+    return generate_transactions(
+        user, *create_fixtures(user, years, rng), transactions, years, rng, chunk_size=chunk_size
+    )
+
+
+def generate_users(prefix, start, end, transactions, years, seed, password, chunk_size=CHUNK_SIZE):
+    """
+    Crea los usuarios ``prefix-start`` a ``prefix-(end-1)`` con sus datos y
+    devuelve cuántas transacciones se insertaron. Cada usuario recibe entre la
+    mitad y el 150% de ``transactions``.
+    
+    Una carga interrumpida se puede retomar: el usuario se crea junto con sus
+    datos fijos en una sola transacción, y a los que ya existen solo se les
+    agregan las transacciones que les faltan (cada lote se confirma entero).
+    
+    Pensada para correr dentro de un proceso del pool: usa su propia conexión.
+    """
+    from django.db import connection
+    from django.db.models import Count
+    
+    User = get_user_model()
+    
+    if connection.vendor == 'postgresql':
+        # Carga masiva: no esperar el flush del WAL en cada commit
+        with connection.cursor() as cursor:
+            cursor.execute('SET synchronous_commit TO OFF')
+    
+    emails = [f'{prefix}-{index}@load.local' for index in range(start, end)]
+    existing = {
+        user.email: user
+        for user in User.objects.filter(email__in=emails).annotate(transaction_count=Count('transactions'))
+    }
+    
+    created = 0
+    for index, email in zip(range(start, end), emails):
+        rng = random.Random(seed * 1_000_003 + index)
+        count = rng.randint(transactions // 2, transactions * 3 // 2) if transactions else 0
+        
+        user = existing.get(email)
+        if user is None:
+            with transaction.atomic():
+                user = User.objects.create(email=email, username=f'{prefix}-{index}', password=password)
+                fixtures = create_fixtures(user, years, rng)
+        else:
+            count -= user.transaction_count
+            if count <= 0:
+                continue
+            fixtures = load_fixtures(user)
+        
+        created += generate_transactions(user, *fixtures, count, years, rng, chunk_size=chunk_size)
+    
+    connection.close()
+    return created
+
+
+def seed_user(email, transactions, years=2, seed=0, chunk_size=CHUNK_SIZE):
+    """
+    Crea (o reutiliza) un usuario sintético con ``transactions`` transacciones.
+    Si ya existe con otro volumen se elimina y se vuelve a generar.
+    """
+    User = get_user_model()
+    
+    user = User.objects.filter(email=email).first()
+    if user is not None:
+        if user.transactions.count() == transactions:
+            return user
+        user.delete()
+    
+    rng = random.Random(seed)
+    user = User(email=email, username=email.split('@')[0])
+    user.set_password(PASSWORD)
+    user.save()
+    
+    populate_user(user, transactions, years, rng, chunk_size=chunk_size)
+    return user
@@ -0,0 +1,228 @@
+import json
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.test.utils import override_settings
+
+from .benchmarks import measure, summarize
+from .instrumentation import RequestMetrics, wrap_queries
+
+SIZES = {
+    'small': 1_000,
+    'medium': 50_000,
+    'large': 500_000,
+}
+
+# Tolerancias por defecto antes de considerar que un endpoint empeoró
+LATENCY_TOLERANCE = 0.25
+LATENCY_SLACK_MS = 5.0
+
+ENDPOINTS = [
+    ('auth.profile', '/api/auth/profile/'),
+    ('accounts.list', '/api/accounts/'),
+    ('accounts.detail', '/api/accounts/{account}/'),
+    ('accounts.details', '/api/accounts/{account}/details/'),
+    ('accounts.total_balance', '/api/accounts/total_balance/'),
+    ('categories.list', '/api/categories/'),
+    ('categories.by_type', '/api/categories/by_type/?type=gasto'),
+    ('categories.secondary', '/api/categories/secondary/'),
+    ('transactions.list', '/api/transactions/'),
+    ('transactions.detail', '/api/transactions/{transaction}/'),
+    ('transactions.summary', '/api/transactions/summary/'),
+    ('transactions.by_category', '/api/transactions/by_category/'),
+    ('transactions.by_secondary_category', '/api/transactions/by_secondary_category/'),
+    ('transactions.recent', '/api/transactions/recent/'),
+    ('transactions.ant_expenses', '/api/transactions/ant_expenses/'),
+    ('transactions.recurring', '/api/transactions/recurring/'),
+    ('transactions.upcoming', '/api/transactions/recurring/upcoming/'),
+    ('budgets.list', '/api/budgets/'),
+    ('budgets.alerts', '/api/budgets/alerts/'),
+    ('budgets.transactions', '/api/budgets/{budget}/transactions/'),
+    ('investments.list', '/api/investments/'),
+    ('investments.summary', '/api/investments/summary/'),
+    ('debts.list', '/api/debts/'),
+    ('debts.summary', '/api/debts/summary/'),
+    ('debts.strategy', '/api/debts/strategy/'),
+    ('debts.payments', '/api/debts/{debt}/payments/'),
+    ('debts.schedule', '/api/debts/{debt}/schedule/'),
+    ('bets.list', '/api/bets/'),
+    ('bets.statistics', '/api/bets/statistics/'),
+    ('goals.list', '/api/goals/'),
+    ('goals.active', '/api/goals/active/'),
+    ('goals.progress', '/api/goals/{goal}/progress/'),
+    ('reports.dashboard', '/api/reports/dashboard/?date_from={year_ago}&date_to={today}'),
+    ('reports.bootstrap', '/api/reports/bootstrap/?date_from={year_ago}&date_to={today}'),
+    ('reports.by_secondary_category', '/api/reports/by_secondary_category/?by_category=true'),
+    ('reports.category_trend', '/api/reports/category-trend/?category_id={category}&days=365'),
+    ('reports.habits_analysis', '/api/reports/habits-analysis/?change_date={half_year_ago}&period_days=90'),
+    ('reports.category_tree', '/api/reports/category-tree/?date_from={year_ago}&date_to={today}'),
+]
+
+# Escrituras: (nombre, método, ruta, cuerpo). Cada request se revierte, así
+# el usuario sintético no cambia entre iteraciones ni entre ejecuciones
+WRITE_ENDPOINTS = [
+    ('transactions.create', 'post', '/api/transactions/', lambda p: {
+        'transaction_type': 'gasto', 'amount': '1000', 'description': 'bench',
+        'date': p['today'], 'account': p['account'], 'category': p['expense_category'],
+    }),
+    ('transactions.update', 'patch', '/api/transactions/{transaction}/', lambda p: {'description': 'bench'}),
+    ('budgets.create', 'post', '/api/budgets/', lambda p: {
+        'category': p['expense_category'], 'amount_limit': '100000', 'period': 'mensual', 'start_date': p['today'],
+    }),
+    ('budgets.update', 'patch', '/api/budgets/{budget}/', lambda p: {'amount_limit': '150000'}),
+    ('debts.add_payment', 'post', '/api/debts/{debt}/add_payment/', lambda p: {
+        'amount': '1', 'payment_date': p['today'],
+    }),
+    ('debts.bulk_payments', 'post', '/api/debts/bulk_payments/', lambda p: {
+        'payments': [{'debt': p['debt'], 'amount': '1', 'payment_date': p['today']}],
+    }),
+]
+
+
+def default_baseline_path():
+    return Path(settings.BASE_DIR) / 'benchmarks' / 'baseline.json'
+
+
+def endpoint_params(user):
+    """Ids y fechas con los que se completan las rutas de ``ENDPOINTS``."""
+    from apps.budgets.models import Budget
+    from apps.debts.models import Debt
+    from apps.goals.models import Goal
+    from apps.transactions.models import Transaction
+    
+    today = date.today()
+    latest = Transaction.objects.filter(user=user, category__isnull=False).order_by('-date', '-id').first()
+    expense = Transaction.objects.filter(user=user, category__category_type='gasto').order_by('-date', '-id').first()
+    return {
+        'today': today.isoformat(),
+        'year_ago': (today - timedelta(days=365)).isoformat(),
+        'half_year_ago': (today - timedelta(days=182)).isoformat(),
+        'account': user.accounts.values_list('id', flat=True).first(),
+        'transaction': latest.id if latest else None,
+        'category': latest.category_id if latest else None,
+        'expense_category': expense.category_id if expense else None,
+        'budget': Budget.objects.filter(user=user).values_list('id', flat=True).first(),
+        'debt': Debt.objects.filter(user=user).values_list('id', flat=True).first(),
+        'goal': Goal.objects.filter(user=user).values_list('id', flat=True).first(),
+    }
+
+
+def resolve_endpoints(params, only=None):
+    """
+    Requests concretos ``(nombre, método, ruta, cuerpo)``; se omiten los que
+    necesitan un objeto que el usuario no tiene.
+    """
+    params = {k: v for k, v in params.items() if v is not None}
+    endpoints = [(name, 'get', template, None) for name, template in ENDPOINTS] + WRITE_ENDPOINTS
+    resolved = []
+    for name, method, template, payload in endpoints:
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        try:
+            path = template.format(**params)
+            body = payload(params) if payload else None
+        except KeyError:
+            continue
+        resolved.append((name, method, path, body))
+    return resolved
+
+
+def _rolled_back(request):
+    def run():
+        with transaction.atomic():
+            response = request()
+            transaction.set_rollback(True)
+        return response
+    return run
+
+
+def api_client(user):
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+    
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    return client
+
+
+def count_queries(func):
+    """
+    Ejecuta ``func`` una vez y cuenta las consultas en todas las conexiones,
+    incluidas las de los hilos que ejecutan las secciones del dashboard.
+    """
+    counter = RequestMetrics()
+    with wrap_queries(lambda connection: counter):
+        result = func()
+    return result, counter.queries
+
+
+def run_endpoints(user, iterations, warmup=1, only=None):
+    """
+    Mide cada endpoint con el usuario dado: número de consultas de un request
+    con las cachés calientes y percentiles de latencia sobre ``iterations``.
+    """
+    client = api_client(user)
+    results = {}
+    
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        for name, method, path, body in resolve_endpoints(endpoint_params(user), only):
+            if method == 'get':
+                request = lambda: client.get(path)
+            else:
+                request = _rolled_back(lambda: getattr(client, method)(path, body, format='json'))
+            for _ in range(warmup):
+                request()
+            
+            response, queries = count_queries(request)
+            samples = measure(request, iterations)
+            results[name] = {
+                'path': path,
+                'status': response.status_code,
+                'queries': queries,
+                **summarize(samples),
+            }
+    return results
+
+
+def load_baseline(path, required=True):
+    """Línea base guardada; sin archivo es un error salvo que se vaya a crear."""
+    path = Path(path)
+    if not path.exists():
+        if required:
+            raise FileNotFoundError(path)
+        return {}
+    with path.open() as fh:
+        return json.load(fh)
+
+
+def save_baseline(path, baseline):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open('w') as fh:
+        json.dump(baseline, fh, indent=2, sort_keys=True)
+        fh.write('\n')
+
+
+def find_regressions(results, baseline, tolerance=LATENCY_TOLERANCE, slack_ms=LATENCY_SLACK_MS):
+    """
+    Compara contra la línea base: cualquier consulta adicional es regresión, y
+    la latencia p95 lo es cuando supera la base en ``tolerance`` más ``slack_ms``.
+    """
+    regressions = []
+    for name, result in results.items():
+        if result['status'] >= 400:
+            regressions.append(f'{name}: respondió {result["status"]}')
+            continue
+        
+        previous = baseline.get(name)
+        if not previous:
+            regressions.append(f'{name}: sin línea base (ejecute con --update-baseline)')
+            continue
+        if result['queries'] > previous['queries']:
+            regressions.append(f'{name}: {result["queries"]} consultas (base {previous["queries"]})')
+        limit = previous['p95_ms'] * (1 + tolerance) + slack_ms
+        if result['p95_ms'] > limit:
+            regressions.append(f'{name}: p95 {result["p95_ms"]:.1f}ms (base {previous["p95_ms"]:.1f}ms)')
+    return regressions
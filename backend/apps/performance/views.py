@@ -0,0 +1,49 @@
+import hmac
+import json
+
+from django.conf import settings
+from django.contrib import admin
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden
+from django.shortcuts import render
+from django.views.decorators.http import require_GET
+
+from . import metrics
+from .profiling import ProfileStore, to_speedscope
+
+
+@require_GET
+def metrics_view(request):
+    """Métricas de todos los workers en formato de texto de Prometheus."""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        provided = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not hmac.compare_digest(provided, token):
+            return HttpResponseForbidden()
+    
+    return HttpResponse(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@require_GET
+def profile_list(request):
+    """Perfiles guardados, para el admin."""
+    context = {
+        **admin.site.each_context(request),
+        'title': 'Perfiles de requests',
+        'profiles': ProfileStore().list(),
+    }
+    return render(request, 'performance/profiles.html', context)
+
+
+@require_GET
+def profile_download(request, name):
+    """Descarga un perfil como pstats (por defecto) o con ``?format=speedscope``."""
+    path = ProfileStore().path(name)
+    if path is None:
+        raise Http404('Perfil no encontrado')
+    
+    if request.GET.get('format') == 'speedscope':
+        response = HttpResponse(json.dumps(to_speedscope(path)), content_type='application/json')
+        response['Content-Disposition'] = f'attachment; filename="{path.stem}.speedscope.json"'
+        return response
+    
+    return FileResponse(path.open('rb'), as_attachment=True, filename=path.name)
@@ -0,0 +1,147 @@
+"""
+Carga inicial del frontend en un solo request: ``include=`` elige qué
+recursos devolver y cada uno se calcula con la misma lógica que su endpoint
+(queryset del viewset y serializer de listado), en paralelo con las secciones
+del dashboard.
+"""
+import logging
+from functools import partial
+
+from apps.accounts.views import AccountViewSet
+from apps.budgets.views import BudgetViewSet, budget_alerts
+from apps.categories.views import CategoryViewSet, SecondaryCategoryViewSet
+from apps.debts.views import DebtViewSet
+from apps.goals.views import GoalViewSet
+from apps.transactions.views import TransactionViewSet
+
+from .dashboard import SECTIONS, run_concurrently
+
+logger = logging.getLogger(__name__)
+
+
+def _viewset(viewset_class, request, action):
+    return viewset_class(request=request, action=action, format_kwarg=None, args=(), kwargs={})
+
+
+def _list(viewset_class, request, **filters):
+    # Sin filtros de query params ni paginación: el listado completo del usuario
+    view = _viewset(viewset_class, request, 'list')
+    queryset = view.get_queryset()
+    if filters:
+        queryset = queryset.filter(**filters)
+    return view.get_serializer(queryset, many=True).data
+
+
+def accounts_resource(request, query):
+    return _list(AccountViewSet, request)
+
+
+def categories_resource(request, query):
+    return _list(CategoryViewSet, request)
+
+
+def secondary_categories_resource(request, query):
+    return _list(SecondaryCategoryViewSet, request)
+
+
+def goals_resource(request, query):
+    # Igual que /goals/active/
+    return _list(GoalViewSet, request, is_active=True)
+
+
+def debts_resource(request, query):
+    return _list(DebtViewSet, request)
+
+
+def recent_transactions_resource(request, query):
+    view = _viewset(TransactionViewSet, request, 'recent')
+    return view.recent(request).data
+
+
+def ant_expenses_resource(request, query):
+    view = _viewset(TransactionViewSet, request, 'ant_expenses')
+    return view.ant_expenses(request).data
+
+
+def budgets_resources(request, query, names):
+    # Presupuestos y alertas salen de una sola serialización
+    data = _list(BudgetViewSet, request)
+    result = {}
+    if 'budgets' in names:
+        result['budgets'] = data
+    if 'budget_alerts' in names:
+        result['budget_alerts'] = budget_alerts([budget for budget in data if budget['is_active']])
+    return result
+
+
+RESOURCES = {
+    'accounts': accounts_resource,
+    'categories': categories_resource,
+    'secondary_categories': secondary_categories_resource,
+    'budgets': None,
+    'budget_alerts': None,
+    'goals': goals_resource,
+    'debts': debts_resource,
+    'recent_transactions': recent_transactions_resource,
+    'ant_expenses': ant_expenses_resource,
+    'dashboard': None,
+}
+
+
+def parse_include(value):
+    """Recursos pedidos con ``include=a,b``; todos si no se indica."""
+    if not value:
+        return list(RESOURCES)
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in RESOURCES]
+    if unknown:
+        raise ValueError(', '.join(unknown))
+    return list(dict.fromkeys(names))
+
+
+def _guarded(names, task):
+    """Un recurso que falla se informa en ``errors`` sin tumbar el resto."""
+    try:
+        return task(), None
+    except Exception as e:
+        logger.error('Error computing bootstrap resources %s: %s', ', '.join(names), e, exc_info=True)
+        return None, str(e)
+
+
+def build_bootstrap(request, query, names, sections):
+    """
+    Arma la respuesta combinada. Las secciones del dashboard se ejecutan como
+    tareas independientes en el mismo pool que el resto de los recursos.
+    """
+    tasks = []
+    for name in names:
+        if RESOURCES[name] is not None:
+            tasks.append(('resource', [name], partial(RESOURCES[name], request, query)))
+    
+    budget_names = [name for name in names if name in ('budgets', 'budget_alerts')]
+    if budget_names:
+        tasks.append(('fragment', budget_names, partial(budgets_resources, request, query, budget_names)))
+    
+    if 'dashboard' in names:
+        for section in sections:
+            tasks.append(('dashboard', [f'dashboard.{section}'], partial(SECTIONS[section], query)))
+    
+    results = run_concurrently([partial(_guarded, task_names, task) for _, task_names, task in tasks])
+    
+    response = {name: None for name in names}
+    if 'dashboard' in names:
+        response['dashboard'] = {}
+    errors = {}
+    for (kind, task_names, _), (value, error) in zip(tasks, results):
+        if error is not None:
+            errors.update({name: error for name in task_names})
+        elif kind == 'resource':
+            response[task_names[0]] = value
+        elif kind == 'fragment':
+            response.update(value)
+        else:
+            response['dashboard'].update(value)
+    
+    if errors:
+        response['errors'] = errors
+    return response
@@ -0,0 +1,432 @@
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+
+from apps.accounts.models import Account
+from apps.budgets.models import Budget
+from apps.categories.cache import category_details
+from apps.debts.models import Debt
+from apps.investments.models import Investment
+from apps.performance.instrumentation import propagated_query_wrappers
+from apps.transactions.models import Transaction
+from apps.transactions.reporting import expense_lines
+from apps.transactions.serializers import TransactionListSerializer
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardQuery:
+    """Filtros del dashboard compartidos por todas las secciones."""
+    
+    def __init__(self, user, date_from=None, date_to=None, account_id=None, category_id=None, transaction_type=None):
+        today = date.today()
+        self.user = user
+        self.date_from = date_from or today.replace(day=1)
+        self.date_to = date_to or today
+        self.account_id = account_id
+        self.category_id = category_id
+        self.transaction_type = transaction_type
+    
+    @classmethod
+    def from_params(cls, user, params):
+        """Lee los filtros de los query params; lanza ValueError si una fecha es inválida."""
+        date_from = params.get('date_from')
+        date_to = params.get('date_to')
+        return cls(
+            user,
+            date_from=date.fromisoformat(date_from) if date_from else None,
+            date_to=date.fromisoformat(date_to) if date_to else None,
+            account_id=params.get('account'),
+            category_id=params.get('category'),
+            transaction_type=params.get('transaction_type'),
+        )
+    
+    def transactions(self):
+        transactions = Transaction.objects.filter(
+            user=self.user,
+            date__gte=self.date_from,
+            date__lte=self.date_to
+        ).exclude(transaction_type='ajuste').select_related('account', 'category', 'destination_account')
+        
+        if self.account_id:
+            transactions = transactions.filter(account_id=self.account_id)
+        if self.category_id:
+            transactions = transactions.filter(category_id=self.category_id)
+        if self.transaction_type:
+            transactions = transactions.filter(transaction_type=self.transaction_type)
+        return transactions
+    
+    def expense_lines(self):
+        # Gastos atribuidos: ítems de compra y transacciones sin ítems
+        lines = expense_lines(self.user, date_from=self.date_from, date_to=self.date_to, account_id=self.account_id)
+        if self.category_id:
+            lines = lines.filter(category_id=self.category_id)
+        if self.transaction_type:
+            lines = lines.filter(transaction_type=self.transaction_type)
+        return lines
+
+
+def _total(queryset, field='amount'):
+    return float(queryset.aggregate(total=Sum(field))['total'] or 0)
+
+
+def totals_section(query):
+    transactions = query.transactions()
+    
+    try:
+        income = _total(transactions.filter(transaction_type='ingreso'))
+    except Exception as e:
+        logger.error('Error calculating income: %s', e, exc_info=True)
+        income = 0.0
+    
+    try:
+        expenses = _total(transactions.filter(transaction_type='gasto'))
+    except Exception as e:
+        logger.error('Error calculating expenses: %s', e, exc_info=True)
+        expenses = 0.0
+    
+    try:
+        ant_expenses = _total(query.expense_lines().filter(is_ant_expense=True))
+    except Exception as e:
+        logger.error('Error calculating ant_expenses: %s', e, exc_info=True)
+        ant_expenses = 0.0
+    
+    return {
+        'month_summary': {
+            'income': income,
+            'expenses': expenses,
+            'balance': income - expenses
+        },
+        'ant_expenses': {
+            'ant': ant_expenses,
+            'normal': expenses - ant_expenses,
+            'total': expenses
+        },
+    }
+
+
+def balance_section(query):
+    total_balance = 0.0
+    if not query.account_id:
+        accounts = Account.objects.filter(
+            user=query.user,
+            include_in_total=True,
+            is_active=True
+        )
+        total_balance = sum(float(acc.balance) if acc.balance is not None else 0.0 for acc in accounts)
+    return {'total_balance': total_balance}
+
+
+def categories_section(query):
+    item_totals = {
+        row['category_id']: float(row['total'] or 0)
+        for row in query.expense_lines().filter(
+            category__isnull=False,
+            category__category_type='gasto'
+        ).order_by().values('category_id').annotate(total=Sum('amount'))
+    }
+    
+    # Nombre, color, icono y padre desde el árbol de categorías cacheado
+    categories = category_details(query.user, item_totals.keys())
+    items_by_category = []
+    for cat_id, total in item_totals.items():
+        category = categories.get(cat_id)
+        if category is None:
+            continue
+        parent = categories.get(category['parent_id'])
+        items_by_category.append({
+            'category__id': cat_id,
+            'category__name': category['name'],
+            'category__color': category['color'],
+            'category__icon': category['icon'],
+            'category__parent_id': category['parent_id'],
+            'category__parent__name': parent['name'] if parent else None,
+            'category__parent__color': parent['color'] if parent else None,
+            'total': total
+        })
+    
+    return {'expenses_by_category': sorted(items_by_category, key=lambda x: x['total'], reverse=True)}
+
+
+def accounts_section(query):
+    transactions = query.transactions()
+    expenses_by_account = list(transactions.filter(
+        transaction_type='gasto'
+    ).values(
+        'account__id',
+        'account__name',
+        'account__color'
+    ).annotate(
+        total=Sum('amount')
+    ).order_by('-total'))
+    
+    account_stats = {}
+    if not query.account_id:
+        # Ingresos y gastos de todas las cuentas en una consulta agrupada
+        totals = {
+            (row['account_id'], row['transaction_type']): float(row['total'] or 0)
+            for row in transactions.filter(
+                transaction_type__in=('ingreso', 'gasto')
+            ).order_by().values('account_id', 'transaction_type').annotate(total=Sum('amount'))
+        }
+        for account_id in Account.objects.filter(user=query.user, is_active=True).values_list('id', flat=True):
+            account_stats[account_id] = {
+                'income': totals.get((account_id, 'ingreso'), 0.0),
+                'expenses': totals.get((account_id, 'gasto'), 0.0)
+            }
+    
+    return {'expenses_by_account': expenses_by_account, 'account_stats': account_stats}
+
+
+def recent_section(query):
+    recent_transactions = query.transactions().order_by('-date', '-created_at')[:10]
+    return {'recent_transactions': TransactionListSerializer(recent_transactions, many=True).data}
+
+
+def budgets_section(query):
+    budget_alerts = []
+    if query.account_id or query.category_id:
+        return {'budget_alerts': budget_alerts}
+    
+    transactions = query.transactions()
+    budgets = Budget.objects.filter(
+        user=query.user,
+        is_active=True
+    ).select_related('category')
+    
+    spent_by_category = {
+        row['category_id']: row['total']
+        for row in transactions.filter(
+            transaction_type='gasto',
+            category_id__in={budget.category_id for budget in budgets}
+        ).order_by().values('category_id').annotate(total=Sum('amount'))
+    }
+    
+    for budget in budgets:
+        spent = spent_by_category.get(budget.category_id) or 0
+        
+        percentage = 0
+        if budget.amount_limit > 0:
+            percentage = (spent / budget.amount_limit) * 100
+        
+        if percentage >= budget.alert_threshold:
+            budget_alerts.append({
+                'id': budget.id,
+                'category': budget.category.name,
+                'limit': float(budget.amount_limit),
+                'spent': float(spent),
+                'percentage': round(percentage, 2),
+                'period': budget.period
+            })
+    return {'budget_alerts': budget_alerts}
+
+
+def investments_section(query):
+    investments_total = 0.0
+    if not query.account_id:
+        investments = Investment.objects.filter(
+            user=query.user,
+            is_active=True
+        )
+        investments_total = float(sum(inv.current_amount for inv in investments))
+    return {'investments_total': investments_total}
+
+
+def debts_section(query):
+    debts_remaining = 0.0
+    if not query.account_id:
+        debts = Debt.objects.filter(
+            user=query.user,
+            is_paid=False
+        )
+        debts_remaining = float(sum(debt.remaining_amount for debt in debts))
+    return {'debts_remaining': debts_remaining}
+
+
+def _next_month(day):
+    if day.month == 12:
+        return date(day.year + 1, 1, 1)
+    return date(day.year, day.month + 1, 1)
+
+
+def monthly_trends_section(query):
+    if query.account_id or query.category_id:
+        return {'monthly_trends': []}
+    
+    # Una consulta agrupada por mes y tipo; el primer mes se cuenta completo
+    totals = {
+        (row['month'], row['transaction_type']): float(row['total'] or 0)
+        for row in Transaction.objects.filter(
+            user=query.user,
+            date__gte=query.date_from.replace(day=1),
+            date__lte=query.date_to,
+            transaction_type__in=('ingreso', 'gasto')
+        ).annotate(
+            month=TruncMonth('date')
+        ).order_by().values('month', 'transaction_type').annotate(total=Sum('amount'))
+    }
+    
+    months_data = []
+    month_start = query.date_from.replace(day=1)
+    while month_start <= query.date_to:
+        months_data.append({
+            'month': month_start.strftime('%Y-%m'),
+            'month_label': month_start.strftime('%b %Y'),
+            'income': totals.get((month_start, 'ingreso'), 0.0),
+            'expenses': totals.get((month_start, 'gasto'), 0.0)
+        })
+        month_start = _next_month(month_start)
+    
+    return {'monthly_trends': months_data[-12:]}
+
+
+def daily_expenses_section(query):
+    if query.account_id or query.category_id:
+        return {'daily_expenses': []}
+    
+    totals = {
+        row['date']: float(row['total'] or 0)
+        for row in query.transactions().filter(
+            transaction_type='gasto'
+        ).order_by().values('date').annotate(total=Sum('amount'))
+    }
+    
+    daily_expenses = []
+    current_date = query.date_from
+    while current_date <= query.date_to:
+        daily_expenses.append({
+            'date': current_date.isoformat(),
+            'day': current_date.day,
+            'day_name': current_date.strftime('%a'),
+            'total': totals.get(current_date, 0.0)
+        })
+        current_date += timedelta(days=1)
+    return {'daily_expenses': daily_expenses}
+
+
+SECTIONS = {
+    'totals': totals_section,
+    'balance': balance_section,
+    'categories': categories_section,
+    'accounts': accounts_section,
+    'recent': recent_section,
+    'budgets': budgets_section,
+    'investments': investments_section,
+    'debts': debts_section,
+    'monthly_trends': monthly_trends_section,
+    'daily_expenses': daily_expenses_section,
+}
+
+
+def parse_sections(value):
+    """
+    Secciones pedidas con ``sections=a,b``; todas si no se indica. Lanza
+    ValueError con las desconocidas.
+    """
+    if not value:
+        return list(SECTIONS)
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SECTIONS]
+    if unknown:
+        raise ValueError(', '.join(unknown))
+    return list(dict.fromkeys(names))
+
+
+def _max_workers():
+    return getattr(settings, 'REPORT_SECTION_WORKERS', 4)
+
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """
+    Pool de hilos persistente por proceso. Cada hilo conserva su conexión a
+    la base de datos entre requests (CONN_MAX_AGE), así que el proceso abre
+    como máximo REPORT_SECTION_WORKERS conexiones adicionales. Se crea en el
+    primer uso dentro del worker, no en el master de gunicorn (preload).
+    """
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        with _executor_lock:
+            if _executor is None or _executor_pid != os.getpid():
+                _executor = ThreadPoolExecutor(max_workers=_max_workers(), thread_name_prefix='dashboard')
+                _executor_pid = os.getpid()
+    return _executor
+
+
+def _close_old_connections():
+    # Lo mismo que hace Django al empezar y terminar cada request
+    for connection in connections.all(initialized_only=True):
+        connection.close_if_unusable_or_obsolete()
+
+
+def _run_isolated(task):
+    _close_old_connections()
+    try:
+        # Las consultas del hilo se suman a las métricas del request que lo lanzó
+        with propagated_query_wrappers():
+            return task()
+    finally:
+        _close_old_connections()
+
+
+def run_concurrently(tasks, max_workers=None):
+    """
+    Ejecuta tareas sin argumentos en el pool del proceso y devuelve sus
+    resultados en el mismo orden. Los contextvars del request (p. ej. el
+    ruteo a la réplica) se copian a cada hilo. Con ``max_workers`` 1 (o
+    REPORT_SECTION_WORKERS=1) se ejecutan en orden en el hilo del request.
+    """
+    max_workers = max_workers or _max_workers()
+    if len(tasks) <= 1 or max_workers <= 1:
+        return [task() for task in tasks]
+    
+    executor = _get_executor()
+    futures = [
+        executor.submit(contextvars.copy_context().run, _run_isolated, task)
+        for task in tasks
+    ]
+    return [future.result() for future in futures]
+
+
+def merge(fragments):
+    result = {}
+    for fragment in fragments:
+        result.update(fragment)
+    return result
+
+
+def section_tasks(query, names):
+    return [partial(SECTIONS[name], query) for name in names]
+
+
+def compute_sections(query, names, max_workers=None):
+    """
+    Calcula las secciones en paralelo; la latencia tiende a la de la sección
+    más lenta en lugar de la suma.
+    """
+    return merge(run_concurrently(section_tasks(query, names), max_workers))
+
+
+async def acompute_sections(query, names):
+    """Versión async de ``compute_sections`` para vistas ASGI, sobre el mismo pool."""
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    futures = [
+        loop.run_in_executor(executor, contextvars.copy_context().run, _run_isolated, task)
+        for task in section_tasks(query, names)
+    ]
+    return merge(await asyncio.gather(*futures))
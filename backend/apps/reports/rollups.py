@@ -0,0 +1,107 @@
+from decimal import Decimal
+
+from django.db import connections, router
+
+from apps.categories.cache import category_details
+from apps.categories.models import Category
+from apps.transactions.models import ExpenseLine
+
+MAX_DEPTH = 32
+
+ROLLUP_SQL = """
+WITH RECURSIVE spend (category_id, total) AS (
+    SELECT l.category_id, SUM(l.amount)
+    FROM {lines} l
+    WHERE l.user_id = %(user_id)s
+      AND l.transaction_type = %(transaction_type)s
+      AND l.date BETWEEN %(date_from)s AND %(date_to)s
+      AND l.category_id IS NOT NULL
+      {account_filter}
+    GROUP BY l.category_id
+),
+ancestry (category_id, ancestor_id, parent_id, depth) AS (
+    SELECT c.id, c.id, c.parent_id, 0
+    FROM {category} c
+    WHERE c.id IN (SELECT category_id FROM spend)
+    UNION ALL
+    SELECT a.category_id, p.id, p.parent_id, a.depth + 1
+    FROM ancestry a
+    JOIN {category} p ON p.id = a.parent_id
+    WHERE a.depth < %(max_depth)s
+)
+SELECT a.ancestor_id,
+       SUM(s.total) AS total,
+       SUM(CASE WHEN a.depth = 0 THEN s.total ELSE 0 END) AS own_total
+FROM ancestry a
+JOIN spend s ON s.category_id = a.category_id
+GROUP BY a.ancestor_id
+"""
+
+
+def rollup_totals(user, date_from, date_to, transaction_type='gasto', account_id=None):
+    """
+    Totales por categoría sumados hacia arriba en todo el árbol, a cualquier
+    profundidad, en una sola consulta recursiva.
+    
+    Devuelve ``{category_id: (total, own_total)}`` donde ``total`` incluye a
+    todas las subcategorías y ``own_total`` solo lo asignado directamente.
+    Agrega sobre las líneas de gasto atribuidas (``ExpenseLine``).
+    """
+    sql = ROLLUP_SQL.format(
+        lines=ExpenseLine._meta.db_table,
+        category=Category._meta.db_table,
+        account_filter='AND l.account_id = %(account_id)s' if account_id else '',
+    )
+    params = {
+        'user_id': user.id,
+        'transaction_type': transaction_type,
+        'date_from': date_from,
+        'date_to': date_to,
+        'account_id': account_id,
+        'max_depth': MAX_DEPTH,
+    }
+    with connections[router.db_for_read(ExpenseLine)].cursor() as cursor:
+        cursor.execute(sql, params)
+        return {
+            category_id: (total or Decimal('0'), own_total or Decimal('0'))
+            for category_id, total, own_total in cursor.fetchall()
+        }
+
+
+def build_rollup_tree(user, totals, root_id=None, max_depth=None):
+    """
+    Arma los nodos anidados a partir de los totales acumulados. Solo se
+    incluyen categorías con movimiento; los hijos van ordenados por total.
+    """
+    details = category_details(user, totals.keys())
+    children = {}
+    for category_id in totals:
+        category = details.get(category_id)
+        parent_id = category['parent_id'] if category else None
+        if parent_id not in totals:
+            parent_id = None
+        children.setdefault(parent_id, []).append(category_id)
+    
+    def node(category_id, depth):
+        category = details.get(category_id) or {}
+        total, own_total = totals[category_id]
+        child_ids = sorted(children.get(category_id, []), key=lambda cid: totals[cid][0], reverse=True)
+        expand = max_depth is None or depth < max_depth
+        return {
+            'id': category_id,
+            'name': category.get('name', 'Sin categoría'),
+            'color': category.get('color'),
+            'icon': category.get('icon'),
+            'parent_id': category.get('parent_id'),
+            'depth': depth,
+            'total': total,
+            'own_total': own_total,
+            'has_children': bool(child_ids),
+            'children': [node(cid, depth + 1) for cid in child_ids] if expand else [],
+        }
+    
+    if root_id is not None:
+        return [node(root_id, 0)] if root_id in totals else []
+    
+    roots = sorted(children.get(None, []), key=lambda cid: totals[cid][0], reverse=True)
+    return [node(category_id, 0) for category_id in roots]
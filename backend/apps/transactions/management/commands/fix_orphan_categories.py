@@ -101,23 +101,23 @@ class Command(BaseCommand):
             for trans_data in orphan_transactions:
                 try:
                     transaction = Transaction.objects.get(id=trans_data['id'])
-                    logger.info(f'Fixing orphan category in transaction {transaction.id}: category_id={trans_data["category_id"]}')
+                    logger.info('Fixing orphan category in transaction %s: category_id=%s', transaction.id, trans_data["category_id"])
                     transaction.category = None
                     transaction.save()
                     fixed_transactions += 1
                 except Transaction.DoesNotExist:
-                    logger.warning(f'Transaction {trans_data["id"]} not found')
+                    logger.warning('Transaction %s not found', trans_data["id"])
             
             fixed_items = 0
             for item_data in orphan_purchase_items:
                 try:
                     item = PurchaseItem.objects.get(id=item_data['id'])
-                    logger.info(f'Fixing orphan category in PurchaseItem {item.id}: category_id={item_data["category_id"]}')
+                    logger.info('Fixing orphan category in PurchaseItem %s: category_id=%s', item.id, item_data["category_id"])
                     item.category = None
                     item.save()
                     fixed_items += 1
                 except PurchaseItem.DoesNotExist:
-                    logger.warning(f'PurchaseItem {item_data["id"]} not found')
+                    logger.warning('PurchaseItem %s not found', item_data["id"])
             
             self.stdout.write(self.style.SUCCESS(
                 f'Corregidas {fixed_transactions} transacciones y {fixed_items} purchase items'
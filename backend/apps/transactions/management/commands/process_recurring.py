@@ -2,12 +2,23 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta
 from apps.transactions.models import Transaction, RecurringTransaction
+from apps.performance.metrics import job_duration, job_items, REGISTRY
 
 
 class Command(BaseCommand):
     help = 'Procesa las transacciones recurrentes pendientes'
     
     def handle(self, *args, **options):
+        with job_duration.time(job='process_recurring'):
+            processed = self.process()
+        job_items.inc(processed, job='process_recurring')
+        REGISTRY.flush(force=True)
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'Procesadas {processed} transacciones recurrentes')
+        )
+    
+    def process(self):
         today = timezone.now().date()
         
         recurring = RecurringTransaction.objects.filter(
@@ -41,9 +52,7 @@ class Command(BaseCommand):
             
             processed += 1
         
-        self.stdout.write(
-            self.style.SUCCESS(f'Procesadas {processed} transacciones recurrentes')
-        )
+        return processed
     
     def calculate_next_date(self, current_date, frequency):
         if frequency == 'diaria':
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-19 10:12
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0006_purchaseitem_secondary_categories_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaseitem',
+            name='line_total',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('amount'), '*', models.F('quantity')), output_field=models.DecimalField(decimal_places=2, max_digits=15), verbose_name='Total de la línea'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseitem',
+            index=models.Index(fields=['category', 'transaction'], include=('line_total',), name='purchaseitem_cat_line_total'),
+        ),
+    ]
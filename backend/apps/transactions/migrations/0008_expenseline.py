@@ -0,0 +1,69 @@
+# Generated by Django 5.0.1 on 2026-10-19 11:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+CREATE_VIEW = """
+CREATE VIEW transactions_expenseline AS
+SELECT 'i' || pi.id AS id,
+       t.id AS transaction_id,
+       pi.id AS item_id,
+       t.user_id,
+       t.account_id,
+       pi.category_id,
+       t.transaction_type,
+       t.date,
+       (pi.is_ant_expense OR t.is_ant_expense) AS is_ant_expense,
+       pi.line_total AS amount
+FROM transactions_purchaseitem pi
+JOIN transactions_transaction t ON t.id = pi.transaction_id
+UNION ALL
+SELECT 't' || t.id,
+       t.id,
+       NULL,
+       t.user_id,
+       t.account_id,
+       t.category_id,
+       t.transaction_type,
+       t.date,
+       t.is_ant_expense,
+       t.amount
+FROM transactions_transaction t
+WHERE NOT EXISTS (
+    SELECT 1 FROM transactions_purchaseitem pi WHERE pi.transaction_id = t.id
+);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_account_currency'),
+        ('categories', '0002_secondarycategory'),
+        ('transactions', '0007_purchaseitem_line_total'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_VIEW, reverse_sql='DROP VIEW IF EXISTS transactions_expenseline;'),
+        migrations.CreateModel(
+            name='ExpenseLine',
+            fields=[
+                ('id', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('transaction_type', models.CharField(choices=[('ingreso', 'Ingreso'), ('gasto', 'Gasto'), ('transferencia', 'Transferencia'), ('ajuste', 'Ajuste')], max_length=15)),
+                ('date', models.DateField()),
+                ('is_ant_expense', models.BooleanField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='accounts.account')),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='categories.category')),
+                ('item', models.ForeignKey(null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='transactions.purchaseitem')),
+                ('transaction', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='transactions.transaction')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'transactions_expenseline',
+                'managed': False,
+            },
+        ),
+    ]
@@ -86,6 +86,8 @@ class Transaction(models.Model):
         super().save(*args, **kwargs)
         
         if is_new:
+            from apps.performance.metrics import transactions_written
+            transactions_written.inc()
             self._apply_transaction()
         elif old_instance and needs_balance_update:
             self._reverse_transaction(old_instance)
@@ -154,6 +156,12 @@ class PurchaseItem(models.Model):
         verbose_name='Categorías Secundarias'
     )
     is_ant_expense = models.BooleanField(default=False, verbose_name='Gasto hormiga')
+    line_total = models.GeneratedField(
+        expression=models.F('amount') * models.F('quantity'),
+        output_field=models.DecimalField(max_digits=15, decimal_places=2),
+        db_persist=True,
+        verbose_name='Total de la línea'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -161,6 +169,13 @@ class PurchaseItem(models.Model):
         verbose_name = 'Producto de compra'
         verbose_name_plural = 'Productos de compra'
         ordering = ['created_at']
+        indexes = [
+            models.Index(
+                fields=['category', 'transaction'],
+                include=['line_total'],
+                name='purchaseitem_cat_line_total'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.quantity}x {self.amount}"
@@ -212,3 +227,26 @@ class RecurringTransaction(models.Model):
     def __str__(self):
         return f"{self.description} ({self.get_frequency_display()})"
 
+
+class ExpenseLine(models.Model):
+    """
+    Vista de atribución: una fila por ítem de compra y una por cada transacción
+    sin ítems. Todos los reportes agregan sobre ella para no contar dos veces
+    una compra desglosada.
+    """
+    id = models.CharField(max_length=32, primary_key=True)
+    transaction = models.ForeignKey(Transaction, on_delete=models.DO_NOTHING, related_name='+')
+    item = models.ForeignKey(PurchaseItem, on_delete=models.DO_NOTHING, null=True, related_name='+')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, related_name='+')
+    account = models.ForeignKey(Account, on_delete=models.DO_NOTHING, related_name='+')
+    category = models.ForeignKey(Category, on_delete=models.DO_NOTHING, null=True, related_name='+')
+    transaction_type = models.CharField(max_length=15, choices=Transaction.TRANSACTION_TYPES)
+    date = models.DateField()
+    is_ant_expense = models.BooleanField()
+    amount = models.DecimalField(max_digits=15, decimal_places=2)
+    
+    class Meta:
+        managed = False
+        db_table = 'transactions_expenseline'
+
+
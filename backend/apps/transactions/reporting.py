@@ -0,0 +1,128 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Sum
+
+from .models import ExpenseLine, PurchaseItem, Transaction
+
+ZERO = Decimal('0')
+
+TransactionTag = Transaction.secondary_categories.through
+PurchaseItemTag = PurchaseItem.secondary_categories.through
+
+
+def expense_lines(user, date_from=None, date_to=None, account_id=None, transaction_type='gasto'):
+    """
+    Líneas de gasto atribuidas: cada ítem de compra con su propia categoría y
+    cada transacción sin ítems con la suya. Es la base común de los reportes
+    por categoría, de gastos hormiga y de hábitos.
+    """
+    lines = ExpenseLine.objects.filter(user=user)
+    if transaction_type:
+        lines = lines.filter(transaction_type=transaction_type)
+    if date_from:
+        lines = lines.filter(date__gte=date_from)
+    if date_to:
+        lines = lines.filter(date__lte=date_to)
+    if account_id:
+        lines = lines.filter(account_id=account_id)
+    return lines
+
+
+def _tag_querysets(user, date_from=None, date_to=None, account_id=None, transaction_type='gasto'):
+    transaction_tags = TransactionTag.objects.filter(
+        transaction__user=user,
+        transaction__transaction_type=transaction_type,
+    )
+    item_tags = PurchaseItemTag.objects.filter(
+        purchaseitem__transaction__user=user,
+        purchaseitem__transaction__transaction_type=transaction_type,
+    )
+    
+    if date_from:
+        transaction_tags = transaction_tags.filter(transaction__date__gte=date_from)
+        item_tags = item_tags.filter(purchaseitem__transaction__date__gte=date_from)
+    if date_to:
+        transaction_tags = transaction_tags.filter(transaction__date__lte=date_to)
+        item_tags = item_tags.filter(purchaseitem__transaction__date__lte=date_to)
+    if account_id:
+        transaction_tags = transaction_tags.filter(transaction__account_id=account_id)
+        item_tags = item_tags.filter(purchaseitem__transaction__account_id=account_id)
+    
+    return transaction_tags, item_tags
+
+
+def secondary_category_totals(user, date_from=None, date_to=None, account_id=None, by_category=False):
+    """
+    Total de gastos por categoría secundaria, agrupado en SQL sobre las tablas
+    intermedias de transacciones e ítems de compra. Los montos son ``Decimal``.
+    
+    Con ``by_category`` cada fila incluye además el desglose por categoría
+    principal (tabla cruzada secundaria × principal).
+    """
+    from apps.categories.cache import category_details
+    from apps.categories.models import SecondaryCategory
+    
+    transaction_tags, item_tags = _tag_querysets(user, date_from, date_to, account_id)
+    
+    totals = defaultdict(lambda: ZERO)
+    cross = defaultdict(lambda: defaultdict(lambda: ZERO))
+    
+    if by_category:
+        transaction_rows = transaction_tags.values_list(
+            'secondarycategory_id', 'transaction__category_id'
+        ).annotate(total=Sum('transaction__amount')).order_by()
+        item_rows = item_tags.values_list(
+            'secondarycategory_id', 'purchaseitem__category_id'
+        ).annotate(total=Sum('purchaseitem__line_total')).order_by()
+        
+        for rows in (transaction_rows, item_rows):
+            for sec_cat_id, category_id, total in rows:
+                totals[sec_cat_id] += total or ZERO
+                cross[sec_cat_id][category_id] += total or ZERO
+    else:
+        transaction_rows = transaction_tags.values_list('secondarycategory_id').annotate(
+            total=Sum('transaction__amount')
+        ).order_by()
+        item_rows = item_tags.values_list('secondarycategory_id').annotate(
+            total=Sum('purchaseitem__line_total')
+        ).order_by()
+        
+        for rows in (transaction_rows, item_rows):
+            for sec_cat_id, total in rows:
+                totals[sec_cat_id] += total or ZERO
+    
+    secondary = {
+        row['id']: row
+        for row in SecondaryCategory.objects.filter(id__in=totals.keys()).values('id', 'name', 'color', 'icon')
+    }
+    categories = category_details(user, {cid for row in cross.values() for cid in row}) if by_category else {}
+    
+    result = []
+    for sec_cat_id, total in totals.items():
+        sec_cat = secondary.get(sec_cat_id, {})
+        row = {
+            'secondary_category__id': sec_cat_id,
+            'secondary_category__name': sec_cat.get('name'),
+            'secondary_category__color': sec_cat.get('color'),
+            'secondary_category__icon': sec_cat.get('icon'),
+            'total': total,
+        }
+        if by_category:
+            row['by_category'] = sorted(
+                (
+                    {
+                        'category__id': category_id,
+                        'category__name': categories[category_id]['name'] if category_id in categories else 'Sin categoría',
+                        'category__color': categories[category_id]['color'] if category_id in categories else None,
+                        'total': category_total,
+                    }
+                    for category_id, category_total in cross[sec_cat_id].items()
+                ),
+                key=lambda x: x['total'],
+                reverse=True
+            )
+        result.append(row)
+    
+    result.sort(key=lambda x: x['total'], reverse=True)
+    return result
@@ -4,6 +4,7 @@ from rest_framework import serializers
 from .models import Transaction, RecurringTransaction, PurchaseItem
 from apps.accounts.serializers import AccountSerializer
 from apps.categories.serializers import CategorySerializer, SecondaryCategorySerializer
+from apps.performance.logs import SampledRows
 
 logger = logging.getLogger(__name__)
 
@@ -54,7 +55,7 @@ class TransactionSerializer(serializers.ModelSerializer):
         category = attrs.get('category')
         amount = attrs.get('amount')
         
-        logger.debug(f'Validating transaction: type={transaction_type}, account={account}, amount={amount}')
+        logger.debug('Validating transaction: type=%s, account=%s, amount=%s', transaction_type, account, amount)
         
         # Validar que amount sea mayor a 0
         if amount is not None and amount <= 0:
@@ -75,14 +76,10 @@ class TransactionSerializer(serializers.ModelSerializer):
         if transaction_type in ['ingreso', 'gasto'] and category:
             user = self.context['request'].user
             
-            from apps.categories.models import Category
-            from django.db.models import Q
+            from apps.categories.cache import get_category
             
-            if not Category.objects.filter(
-                Q(id=category.id),
-                Q(user=user) | Q(is_default=True, user__isnull=True)
-            ).exists():
-                logger.warning(f'User {user.id} attempted to use category {category.id} which is not accessible')
+            if get_category(user, category.id) is None:
+                logger.warning('User %s attempted to use category %s which is not accessible', user.id, category.id)
                 raise serializers.ValidationError({
                     'category': 'La categoría seleccionada no existe o no está disponible para tu usuario.'
                 })
@@ -96,7 +93,7 @@ class TransactionSerializer(serializers.ModelSerializer):
                     'category': 'La categoría debe ser de tipo gasto.'
                 })
             
-            logger.debug(f'Category validation passed: category_id={category.id}, name={category.name}, type={category.category_type}, user={category.user_id if category.user else None}, is_default={category.is_default}')
+            logger.debug('Category validation passed: category_id=%s, name=%s, type=%s, user=%s, is_default=%s', category.id, category.name, category.category_type, category.user_id if category.user else None, category.is_default)
         
         if transaction_type == 'ajuste':
             if destination_account:
@@ -107,12 +104,11 @@ class TransactionSerializer(serializers.ModelSerializer):
         return attrs
     
     def create(self, validated_data):
-        import traceback
         items_data = self.context['request'].data.get('items', [])
         validated_data['user'] = self.context['request'].user
         
-        logger.debug(f'Creating transaction with {len(items_data)} items')
-        logger.debug(f'Validated data keys: {list(validated_data.keys())}')
+        logger.debug('Creating transaction with %s items', len(items_data))
+        logger.debug('Validated data keys: %s', list(validated_data.keys()))
         
         secondary_category_ids = self.context['request'].data.get('secondary_categories', [])
         
@@ -127,9 +123,9 @@ class TransactionSerializer(serializers.ModelSerializer):
                         'items': 'El total de los productos debe ser mayor a 0.'
                     })
                 validated_data['amount'] = total_amount
-                logger.debug(f'Calculated total amount: {total_amount}')
+                logger.debug('Calculated total amount: %s', total_amount)
             except (ValueError, TypeError) as e:
-                logger.error(f'Error calculating total: {str(e)}')
+                logger.error('Error calculating total: %s', e)
                 raise serializers.ValidationError({
                     'items': f'Error al calcular el total de los productos: {str(e)}'
                 })
@@ -148,48 +144,44 @@ class TransactionSerializer(serializers.ModelSerializer):
                 # Si el campo no existe, eliminarlo de validated_data
                 validated_data.pop('related_bet', None)
         except Exception as e:
-            logger.warning(f'Error handling related_bet field: {str(e)}')
+            logger.warning('Error handling related_bet field: %s', e)
             validated_data.pop('related_bet', None)
         
         try:
             category = validated_data.get('category')
             if category:
-                from apps.categories.models import Category
-                from django.db.models import Q
+                from apps.categories.cache import get_category
                 user = self.context['request'].user
                 
-                if not Category.objects.filter(
-                    Q(id=category.id),
-                    Q(user=user) | Q(is_default=True, user__isnull=True)
-                ).exists():
-                    logger.error(f'User {user.id} attempted to create transaction with invalid category {category.id}')
+                if get_category(user, category.id) is None:
+                    logger.error('User %s attempted to create transaction with invalid category %s', user.id, category.id)
                     raise serializers.ValidationError({
                         'category': 'La categoría seleccionada no existe o no está disponible para tu usuario.'
                     })
                 
-                logger.debug(f'Creating transaction with valid category: {category.id} ({category.name})')
+                logger.debug('Creating transaction with valid category: %s (%s)', category.id, category.name)
             
-            logger.debug(f'Creating transaction with data: {validated_data}')
+            logger.debug('Creating transaction with data: %s', validated_data)
             transaction = super().create(validated_data)
-            logger.debug(f'Transaction created successfully: {transaction.id}')
+            logger.debug('Transaction created successfully: %s', transaction.id)
             
             if transaction.category:
-                logger.info(f'Transaction {transaction.id} created with category {transaction.category.id} ({transaction.category.name})')
+                logger.info('Transaction %s created with category %s (%s)', transaction.id, transaction.category.id, transaction.category.name)
         except Exception as e:
-            logger.error(f'Error creating transaction: {str(e)}')
-            logger.error(traceback.format_exc())
+            logger.exception('Error creating transaction: %s', e)
             raise serializers.ValidationError({
                 'non_field_errors': f'Error al crear la transacción: {str(e)}'
             })
         
         if items_data:
             created_items = 0
-            logger.info(f'Creating transaction with {len(items_data)} items, transaction_type={transaction.transaction_type}')
+            rows = SampledRows(logger)
+            logger.info('Creating transaction with %s items, transaction_type=%s', len(items_data), transaction.transaction_type)
             for idx, item_data in enumerate(items_data):
                 try:
                     name = item_data.get('name', '').strip()
                     if not name:
-                        logger.warning(f'Skipping item {idx} - no name provided')
+                        logger.warning('Skipping item %s - no name provided', idx)
                         continue  # Saltar items sin nombre
                     
                     amount = Decimal(str(item_data.get('amount', 0) or 0))
@@ -197,51 +189,40 @@ class TransactionSerializer(serializers.ModelSerializer):
                     category_id = item_data.get('category')
                     
                     if amount <= 0:
-                        logger.warning(f'Skipping item {idx} - invalid amount: {amount}')
+                        logger.warning('Skipping item %s - invalid amount: %s', idx, amount)
                         continue
                     
                     if quantity <= 0:
-                        logger.warning(f'Skipping item {idx} - invalid quantity: {quantity}')
+                        logger.warning('Skipping item %s - invalid quantity: %s', idx, quantity)
                         continue
                     
                     if category_id:
                         try:
                             category_id = int(category_id)
-                            from apps.categories.models import Category
-                            from django.db.models import Q
+                            from apps.categories.cache import get_category
                             
-                            try:
-                                category = Category.objects.get(id=category_id)
-                                
-                                user = self.context['request'].user
-                                if not Category.objects.filter(
-                                    Q(id=category_id),
-                                    Q(user=user) | Q(is_default=True, user__isnull=True)
-                                ).exists():
-                                    logger.warning(f'PurchaseItem {idx}: User {user.id} attempted to use category {category_id} which is not accessible')
-                                    raise serializers.ValidationError({
-                                        'items': f'La categoría seleccionada no existe o no está disponible para tu usuario.'
-                                    })
-                                
-                                logger.debug(f'PurchaseItem {idx}: Validating category {category_id} ({category.name}) type={category.category_type} for transaction_type={transaction.transaction_type}')
-                                if transaction.transaction_type == 'gasto' and category.category_type != 'gasto':
-                                    logger.warning(f'PurchaseItem {idx}: Category {category_id} ({category.name}) is type {category.category_type}, expected "gasto" for expense transaction')
-                                    raise serializers.ValidationError({
-                                        'items': f'La categoría "{category.name}" debe ser de tipo gasto para esta transacción.'
-                                    })
-                                elif transaction.transaction_type == 'ingreso' and category.category_type != 'ingreso':
-                                    logger.warning(f'PurchaseItem {idx}: Category {category_id} ({category.name}) is type {category.category_type}, expected "ingreso" for income transaction')
-                                    raise serializers.ValidationError({
-                                        'items': f'La categoría "{category.name}" debe ser de tipo ingreso para esta transacción.'
-                                    })
-                                logger.debug(f'PurchaseItem {idx}: Category validation passed')
-                            except Category.DoesNotExist:
-                                logger.warning(f'PurchaseItem {idx}: Category {category_id} does not exist')
+                            user = self.context['request'].user
+                            category = get_category(user, category_id)
+                            if category is None:
+                                logger.warning('PurchaseItem %s: User %s attempted to use category %s which does not exist or is not accessible', idx, user.id, category_id)
                                 raise serializers.ValidationError({
-                                    'items': f'La categoría con ID {category_id} no existe.'
+                                    'items': f'La categoría seleccionada no existe o no está disponible para tu usuario.'
                                 })
+                            
+                            rows.debug('PurchaseItem %s: Validating category %s (%s) type=%s for transaction_type=%s', idx, category_id, category["name"], category["category_type"], transaction.transaction_type)
+                            if transaction.transaction_type == 'gasto' and category['category_type'] != 'gasto':
+                                logger.warning('PurchaseItem %s: Category %s (%s) is type %s, expected "gasto" for expense transaction', idx, category_id, category["name"], category["category_type"])
+                                raise serializers.ValidationError({
+                                    'items': f'La categoría "{category["name"]}" debe ser de tipo gasto para esta transacción.'
+                                })
+                            elif transaction.transaction_type == 'ingreso' and category['category_type'] != 'ingreso':
+                                logger.warning('PurchaseItem %s: Category %s (%s) is type %s, expected "ingreso" for income transaction', idx, category_id, category["name"], category["category_type"])
+                                raise serializers.ValidationError({
+                                    'items': f'La categoría "{category["name"]}" debe ser de tipo ingreso para esta transacción.'
+                                })
+                            rows.debug('PurchaseItem %s: Category validation passed', idx)
                         except (ValueError, TypeError) as e:
-                            logger.warning(f'PurchaseItem {idx}: Invalid category_id format: {category_id}')
+                            logger.warning('PurchaseItem %s: Invalid category_id format: %s', idx, category_id)
                             raise serializers.ValidationError({
                                 'items': f'ID de categoría inválido: {category_id}'
                             })
@@ -256,23 +237,22 @@ class TransactionSerializer(serializers.ModelSerializer):
                         category_id=category_id,
                         is_ant_expense=bool(item_data.get('is_ant_expense', False))
                     )
-                    logger.info(f'Created purchase item: id={purchase_item.id}, name={name}, category_id={category_id}, transaction_id={transaction.id}')
+                    rows.info('Created purchase item: id=%s, name=%s, category_id=%s, transaction_id=%s', purchase_item.id, name, category_id, transaction.id)
                     
                     secondary_category_ids = item_data.get('secondary_categories', [])
                     if secondary_category_ids:
                         try:
                             purchase_item.secondary_categories.set(secondary_category_ids)
-                            logger.debug(f'PurchaseItem {purchase_item.id}: Set {len(secondary_category_ids)} secondary categories')
+                            rows.debug('PurchaseItem %s: Set %s secondary categories', purchase_item.id, len(secondary_category_ids))
                         except Exception as e:
-                            logger.warning(f'Error setting secondary categories for item {idx}: {str(e)}')
+                            logger.warning('Error setting secondary categories for item %s: %s', idx, e)
                     created_items += 1
-                    logger.debug(f'Created purchase item: {name} - {quantity}x {amount}')
+                    rows.debug('Created purchase item: %s - %sx %s', name, quantity, amount)
                 except (ValueError, TypeError) as e:
-                    logger.error(f'Error creating purchase item {idx}: {str(e)}')
+                    logger.error('Error creating purchase item %s: %s', idx, e)
                     continue
                 except Exception as e:
-                    logger.error(f'Unexpected error creating purchase item {idx}: {str(e)}')
-                    logger.error(traceback.format_exc())
+                    logger.exception('Unexpected error creating purchase item %s: %s', idx, e)
                     continue
             
             if created_items == 0 and len(items_data) > 0:
@@ -282,16 +262,15 @@ class TransactionSerializer(serializers.ModelSerializer):
             try:
                 transaction.secondary_categories.set(secondary_category_ids)
             except Exception as e:
-                logger.warning(f'Error setting secondary categories: {str(e)}')
+                logger.warning('Error setting secondary categories: %s', e)
         
         return transaction
     
     def update(self, instance, validated_data):
-        import traceback
         items_data = self.context['request'].data.get('items', None)
         secondary_category_ids = self.context['request'].data.get('secondary_categories', None)
         
-        logger.debug(f'Updating transaction {instance.id} with {len(items_data) if items_data else 0} items')
+        logger.debug('Updating transaction %s with %s items', instance.id, len(items_data) if items_data else 0)
         
         if items_data is not None:
             try:
@@ -304,22 +283,23 @@ class TransactionSerializer(serializers.ModelSerializer):
                         'items': 'El total de los productos debe ser mayor a 0.'
                     })
                 validated_data['amount'] = total_amount
-                logger.debug(f'Calculated total amount: {total_amount}')
+                logger.debug('Calculated total amount: %s', total_amount)
             except (ValueError, TypeError) as e:
-                logger.error(f'Error calculating total: {str(e)}')
+                logger.error('Error calculating total: %s', e)
                 raise serializers.ValidationError({
                     'items': f'Error al calcular el total de los productos: {str(e)}'
                 })
             
             instance.items.all().delete()
-            logger.info(f'Updating transaction {instance.id} with {len(items_data)} items, transaction_type={instance.transaction_type}')
+            logger.info('Updating transaction %s with %s items, transaction_type=%s', instance.id, len(items_data), instance.transaction_type)
             
             created_items = 0
+            rows = SampledRows(logger)
             for idx, item_data in enumerate(items_data):
                 try:
                     name = item_data.get('name', '').strip()
                     if not name:
-                        logger.warning(f'Skipping item {idx} - no name provided')
+                        logger.warning('Skipping item %s - no name provided', idx)
                         continue  # Saltar items sin nombre
                     
                     amount = Decimal(str(item_data.get('amount', 0) or 0))
@@ -328,51 +308,40 @@ class TransactionSerializer(serializers.ModelSerializer):
                     is_ant_expense = bool(item_data.get('is_ant_expense', False))
                     
                     if amount <= 0:
-                        logger.warning(f'Skipping item {idx} - invalid amount: {amount}')
+                        logger.warning('Skipping item %s - invalid amount: %s', idx, amount)
                         continue
                     
                     if quantity <= 0:
-                        logger.warning(f'Skipping item {idx} - invalid quantity: {quantity}')
+                        logger.warning('Skipping item %s - invalid quantity: %s', idx, quantity)
                         continue
                     
                     if category_id:
                         try:
                             category_id = int(category_id)
-                            from apps.categories.models import Category
-                            from django.db.models import Q
+                            from apps.categories.cache import get_category
                             
-                            try:
-                                category = Category.objects.get(id=category_id)
-                                
-                                user = self.context['request'].user
-                                if not Category.objects.filter(
-                                    Q(id=category_id),
-                                    Q(user=user) | Q(is_default=True, user__isnull=True)
-                                ).exists():
-                                    logger.warning(f'PurchaseItem {idx}: User {user.id} attempted to use category {category_id} which is not accessible')
-                                    raise serializers.ValidationError({
-                                        'items': f'La categoría seleccionada no existe o no está disponible para tu usuario.'
-                                    })
-                                
-                                logger.debug(f'PurchaseItem {idx}: Validating category {category_id} ({category.name}) type={category.category_type} for transaction_type={instance.transaction_type}')
-                                if instance.transaction_type == 'gasto' and category.category_type != 'gasto':
-                                    logger.warning(f'PurchaseItem {idx}: Category {category_id} ({category.name}) is type {category.category_type}, expected "gasto" for expense transaction')
-                                    raise serializers.ValidationError({
-                                        'items': f'La categoría "{category.name}" debe ser de tipo gasto para esta transacción.'
-                                    })
-                                elif instance.transaction_type == 'ingreso' and category.category_type != 'ingreso':
-                                    logger.warning(f'PurchaseItem {idx}: Category {category_id} ({category.name}) is type {category.category_type}, expected "ingreso" for income transaction')
-                                    raise serializers.ValidationError({
-                                        'items': f'La categoría "{category.name}" debe ser de tipo ingreso para esta transacción.'
-                                    })
-                                logger.debug(f'PurchaseItem {idx}: Category validation passed')
-                            except Category.DoesNotExist:
-                                logger.warning(f'PurchaseItem {idx}: Category {category_id} does not exist')
+                            user = self.context['request'].user
+                            category = get_category(user, category_id)
+                            if category is None:
+                                logger.warning('PurchaseItem %s: User %s attempted to use category %s which does not exist or is not accessible', idx, user.id, category_id)
+                                raise serializers.ValidationError({
+                                    'items': f'La categoría seleccionada no existe o no está disponible para tu usuario.'
+                                })
+                            
+                            rows.debug('PurchaseItem %s: Validating category %s (%s) type=%s for transaction_type=%s', idx, category_id, category["name"], category["category_type"], instance.transaction_type)
+                            if instance.transaction_type == 'gasto' and category['category_type'] != 'gasto':
+                                logger.warning('PurchaseItem %s: Category %s (%s) is type %s, expected "gasto" for expense transaction', idx, category_id, category["name"], category["category_type"])
+                                raise serializers.ValidationError({
+                                    'items': f'La categoría "{category["name"]}" debe ser de tipo gasto para esta transacción.'
+                                })
+                            elif instance.transaction_type == 'ingreso' and category['category_type'] != 'ingreso':
+                                logger.warning('PurchaseItem %s: Category %s (%s) is type %s, expected "ingreso" for income transaction', idx, category_id, category["name"], category["category_type"])
                                 raise serializers.ValidationError({
-                                    'items': f'La categoría con ID {category_id} no existe.'
+                                    'items': f'La categoría "{category["name"]}" debe ser de tipo ingreso para esta transacción.'
                                 })
+                            rows.debug('PurchaseItem %s: Category validation passed', idx)
                         except (ValueError, TypeError) as e:
-                            logger.warning(f'PurchaseItem {idx}: Invalid category_id format: {category_id}')
+                            logger.warning('PurchaseItem %s: Invalid category_id format: %s', idx, category_id)
                             raise serializers.ValidationError({
                                 'items': f'ID de categoría inválido: {category_id}'
                             })
@@ -387,23 +356,22 @@ class TransactionSerializer(serializers.ModelSerializer):
                         category_id=category_id,
                         is_ant_expense=is_ant_expense
                     )
-                    logger.info(f'Created purchase item: id={purchase_item.id}, name={name}, category_id={category_id}, transaction_id={instance.id}')
+                    rows.info('Created purchase item: id=%s, name=%s, category_id=%s, transaction_id=%s', purchase_item.id, name, category_id, instance.id)
                     
                     secondary_category_ids = item_data.get('secondary_categories', [])
                     if secondary_category_ids:
                         try:
                             purchase_item.secondary_categories.set(secondary_category_ids)
-                            logger.debug(f'PurchaseItem {purchase_item.id}: Set {len(secondary_category_ids)} secondary categories')
+                            rows.debug('PurchaseItem %s: Set %s secondary categories', purchase_item.id, len(secondary_category_ids))
                         except Exception as e:
-                            logger.warning(f'Error setting secondary categories for item {idx}: {str(e)}')
+                            logger.warning('Error setting secondary categories for item %s: %s', idx, e)
                     created_items += 1
-                    logger.debug(f'Created purchase item: {name} - {quantity}x {amount}')
+                    rows.debug('Created purchase item: %s - %sx %s', name, quantity, amount)
                 except (ValueError, TypeError) as e:
-                    logger.error(f'Error creating purchase item {idx}: {str(e)}')
+                    logger.error('Error creating purchase item %s: %s', idx, e)
                     continue
                 except Exception as e:
-                    logger.error(f'Unexpected error creating purchase item {idx}: {str(e)}')
-                    logger.error(traceback.format_exc())
+                    logger.exception('Unexpected error creating purchase item %s: %s', idx, e)
                     continue
             
             if created_items == 0 and len(items_data) > 0:
@@ -417,40 +385,36 @@ class TransactionSerializer(serializers.ModelSerializer):
             else:
                 validated_data.pop('related_bet', None)
         except Exception as e:
-            logger.warning(f'Error handling related_bet field: {str(e)}')
+            logger.warning('Error handling related_bet field: %s', e)
             validated_data.pop('related_bet', None)
         
         category = validated_data.get('category')
         if category:
-            from apps.categories.models import Category
-            from django.db.models import Q
+            from apps.categories.cache import get_category
             user = self.context['request'].user
             
-            if not Category.objects.filter(
-                Q(id=category.id),
-                Q(user=user) | Q(is_default=True, user__isnull=True)
-            ).exists():
-                logger.error(f'User {user.id} attempted to update transaction {instance.id} with invalid category {category.id}')
+            if get_category(user, category.id) is None:
+                logger.error('User %s attempted to update transaction %s with invalid category %s', user.id, instance.id, category.id)
                 raise serializers.ValidationError({
                     'category': 'La categoría seleccionada no existe o no está disponible para tu usuario.'
                 })
             
-            logger.debug(f'Updating transaction {instance.id} with valid category: {category.id} ({category.name})')
+            logger.debug('Updating transaction %s with valid category: %s (%s)', instance.id, category.id, category.name)
         
         transaction = super().update(instance, validated_data)
-        logger.info(f'Updated transaction: id={transaction.id}, category_id={transaction.category_id}, transaction_type={transaction.transaction_type}')
+        logger.info('Updated transaction: id=%s, category_id=%s, transaction_type=%s', transaction.id, transaction.category_id, transaction.transaction_type)
         
         if transaction.category:
-            logger.info(f'Transaction {transaction.id} updated with category {transaction.category.id} ({transaction.category.name})')
+            logger.info('Transaction %s updated with category %s (%s)', transaction.id, transaction.category.id, transaction.category.name)
         else:
-            logger.warning(f'Transaction {transaction.id} updated without category')
+            logger.warning('Transaction %s updated without category', transaction.id)
         
         if secondary_category_ids is not None:
             try:
                 transaction.secondary_categories.set(secondary_category_ids)
-                logger.debug(f'Transaction {transaction.id}: Set {len(secondary_category_ids)} secondary categories')
+                logger.debug('Transaction %s: Set %s secondary categories', transaction.id, len(secondary_category_ids))
             except Exception as e:
-                logger.warning(f'Error setting secondary categories: {str(e)}')
+                logger.warning('Error setting secondary categories: %s', e)
         
         return transaction
 
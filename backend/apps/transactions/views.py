@@ -64,77 +64,39 @@ class TransactionViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def by_category(self, request):
-        queryset = self.get_queryset().filter(transaction_type='gasto')
+        from .reporting import expense_lines
+        from apps.categories.cache import category_details
         
-        date_from = request.query_params.get('date_from')
-        date_to = request.query_params.get('date_to')
-        
-        if date_from:
-            queryset = queryset.filter(date__gte=date_from)
-        if date_to:
-            queryset = queryset.filter(date__lte=date_to)
-        
-        by_category = queryset.values(
-            'category__id', 'category__name', 'category__color', 'category__icon'
-        ).annotate(total=Sum('amount')).order_by('-total')
-        
-        return Response(list(by_category))
+        lines = expense_lines(
+            request.user,
+            date_from=request.query_params.get('date_from'),
+            date_to=request.query_params.get('date_to')
+        )
+        totals = list(lines.order_by().values('category_id').annotate(total=Sum('amount')).order_by('-total'))
+        
+        categories = category_details(request.user, [row['category_id'] for row in totals])
+        by_category = []
+        for row in totals:
+            category = categories.get(row['category_id'], {})
+            by_category.append({
+                'category__id': row['category_id'],
+                'category__name': category.get('name'),
+                'category__color': category.get('color'),
+                'category__icon': category.get('icon'),
+                'total': row['total'],
+            })
+        
+        return Response(by_category)
     
     @action(detail=False, methods=['get'])
     def by_secondary_category(self, request):
-        from .models import PurchaseItem
-        from apps.categories.models import SecondaryCategory
-        
-        user = request.user
-        date_from = request.query_params.get('date_from')
-        date_to = request.query_params.get('date_to')
-        
-        transactions = self.get_queryset().filter(transaction_type='gasto')
-        purchase_items = PurchaseItem.objects.filter(
-            transaction__user=user,
-            transaction__transaction_type='gasto'
-        )
-        
-        if date_from:
-            transactions = transactions.filter(date__gte=date_from)
-            purchase_items = purchase_items.filter(transaction__date__gte=date_from)
-        if date_to:
-            transactions = transactions.filter(date__lte=date_to)
-            purchase_items = purchase_items.filter(transaction__date__lte=date_to)
-        
-        secondary_categories_data = {}
-        
-        for transaction in transactions.prefetch_related('secondary_categories'):
-            for sec_cat in transaction.secondary_categories.all():
-                sec_cat_id = sec_cat.id
-                if sec_cat_id not in secondary_categories_data:
-                    secondary_categories_data[sec_cat_id] = {
-                        'secondary_category__id': sec_cat_id,
-                        'secondary_category__name': sec_cat.name,
-                        'secondary_category__color': sec_cat.color,
-                        'secondary_category__icon': sec_cat.icon,
-                        'total': 0.0
-                    }
-                secondary_categories_data[sec_cat_id]['total'] += float(transaction.amount)
+        from .reporting import secondary_category_totals
         
-        for item in purchase_items.prefetch_related('secondary_categories'):
-            for sec_cat in item.secondary_categories.all():
-                sec_cat_id = sec_cat.id
-                item_total = float(item.amount) * int(item.quantity)
-                if sec_cat_id not in secondary_categories_data:
-                    secondary_categories_data[sec_cat_id] = {
-                        'secondary_category__id': sec_cat_id,
-                        'secondary_category__name': sec_cat.name,
-                        'secondary_category__color': sec_cat.color,
-                        'secondary_category__icon': sec_cat.icon,
-                        'total': 0.0
-                    }
-                secondary_categories_data[sec_cat_id]['total'] += item_total
-        
-        result = sorted(
-            secondary_categories_data.values(),
-            key=lambda x: x['total'],
-            reverse=True
+        result = secondary_category_totals(
+            request.user,
+            date_from=request.query_params.get('date_from'),
+            date_to=request.query_params.get('date_to'),
+            by_category=request.query_params.get('by_category', '').lower() in ('1', 'true', 'yes')
         )
         
         return Response(result)
@@ -148,7 +110,7 @@ class TransactionViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def ant_expenses(self, request):
-        from .models import PurchaseItem
+        from .reporting import expense_lines
         
         today = date.today()
         
@@ -169,63 +131,20 @@ class TransactionViewSet(viewsets.ModelViewSet):
         prev_date_from = date_from - timedelta(days=period_days)
         prev_date_to = date_from - timedelta(days=1)
         
-        current_month_transactions = self.get_queryset().filter(
-            is_ant_expense=True,
-            transaction_type='gasto',
-            date__gte=date_from,
-            date__lte=date_to
-        )
-        
-        prev_month_transactions = self.get_queryset().filter(
-            is_ant_expense=True,
-            transaction_type='gasto',
-            date__gte=prev_date_from,
-            date__lte=prev_date_to
-        )
-        
-        current_month_items = PurchaseItem.objects.filter(
-            transaction__user=request.user,
-            is_ant_expense=True,
-            transaction__transaction_type='gasto',
-            transaction__date__gte=date_from,
-            transaction__date__lte=date_to
-        )
-        
-        prev_month_items = PurchaseItem.objects.filter(
-            transaction__user=request.user,
-            is_ant_expense=True,
-            transaction__transaction_type='gasto',
-            transaction__date__gte=prev_date_from,
-            transaction__date__lte=prev_date_to
-        )
-        
-        current_transactions_total = current_month_transactions.aggregate(total=Sum('amount'))['total'] or 0
-        current_transactions_total = float(current_transactions_total) if current_transactions_total is not None else 0.0
-        current_items_total = sum(
-            float(item.amount) * int(item.quantity) 
-            for item in current_month_items
-        )
-        
-        prev_transactions_total = prev_month_transactions.aggregate(total=Sum('amount'))['total'] or 0
-        prev_transactions_total = float(prev_transactions_total) if prev_transactions_total is not None else 0.0
-        prev_items_total = sum(
-            float(item.amount) * int(item.quantity) 
-            for item in prev_month_items
+        ant_lines = expense_lines(request.user, date_from=prev_date_from, date_to=date_to).filter(
+            is_ant_expense=True
         )
+        current_lines = ant_lines.filter(date__gte=date_from)
         
-        current_total = current_transactions_total + current_items_total
-        prev_total = prev_transactions_total + prev_items_total
-        
-        current_count = current_month_transactions.count()
-        transactions_with_items = current_month_items.values_list('transaction_id', flat=True).distinct()
-        transactions_not_counted = transactions_with_items.exclude(
-            id__in=current_month_transactions.values_list('id', flat=True)
+        totals = ant_lines.aggregate(
+            current=Sum('amount', filter=models.Q(date__gte=date_from)),
+            previous=Sum('amount', filter=models.Q(date__lte=prev_date_to))
         )
-        current_count += transactions_not_counted.count()
+        current_total = float(totals['current'] or 0)
+        prev_total = float(totals['previous'] or 0)
         
-        recent_transaction_ids = list(current_month_transactions.values_list('id', flat=True))
-        recent_transaction_ids.extend(list(transactions_with_items))
-        recent_transaction_ids = list(set(recent_transaction_ids))
+        recent_transaction_ids = current_lines.values('transaction_id')
+        current_count = current_lines.values('transaction_id').distinct().count()
         
         recent = self.get_queryset().filter(id__in=recent_transaction_ids).order_by('-date')[:5]
         serializer = TransactionListSerializer(recent, many=True)
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class UsersConfig(AppConfig):
+    name = 'apps.users'
+    verbose_name = 'Usuarios'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
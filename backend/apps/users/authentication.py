@@ -0,0 +1,103 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.performance.metrics import record_cache
+
+
+# Campos que leen la autenticación, los permisos y los serializers; nunca la contraseña
+CACHED_FIELDS = (
+    'id', 'email', 'username', 'first_name', 'last_name', 'preferred_currency',
+    'is_active', 'is_staff', 'is_superuser',
+)
+# Marca que deja invalidate_cached_user en lugar del usuario
+INVALIDATED = 'invalidated'
+INVALIDATION_TTL = 30
+
+
+def _timeout():
+    return getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 300)
+
+
+def _check_revoke():
+    return getattr(api_settings, 'CHECK_REVOKE_TOKEN', False)
+
+
+def user_cache_key(user_id):
+    return f'users:auth:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    """
+    Descarta el usuario cacheado; se llama al cambiar el perfil o la
+    contraseña. Deja una marca en vez de borrar la clave: un request que leyó
+    la fila antes del cambio no puede volver a cachearla mientras exista,
+    porque el llenado usa ``cache.add``.
+    """
+    cache.set(user_cache_key(user_id), INVALIDATED, INVALIDATION_TTL)
+
+
+def _to_cache(user):
+    data = {field: getattr(user, field) for field in CACHED_FIELDS}
+    if _check_revoke():
+        from rest_framework_simplejwt.utils import get_md5_hash_password
+        
+        data['password_md5'] = get_md5_hash_password(user.password)
+    return data
+
+
+def _from_cache(user_model, data):
+    # Instancia sin contraseña: las vistas que guardan el usuario lo leen con fresh_user()
+    user = user_model(**{field: data[field] for field in CACHED_FIELDS})
+    user._state.adding = False
+    user._state.db = 'default'
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    Igual que JWTAuthentication pero resuelve el usuario desde la caché por
+    id, evitando leer la tabla de usuarios en cada request. Se cachean solo
+    los campos de CACHED_FIELDS (y el md5 de la contraseña si se usa
+    CHECK_REVOKE_TOKEN), con una sola consulta a la caché por request. Las
+    escrituras del usuario lo invalidan (apps.users.signals); solo se cachea
+    con una caché compartida, si no cada worker vería sus propias versiones.
+    """
+    
+    def get_user(self, validated_token):
+        from apps.performance.caching import cache_is_shared
+        
+        if not cache_is_shared():
+            return super().get_user(validated_token)
+        
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+        
+        key = user_cache_key(user_id)
+        data = cache.get(key)
+        hit = isinstance(data, dict)
+        record_cache('auth_user', hit)
+        if hit:
+            user = _from_cache(self.user_model, data)
+        else:
+            # Siempre del primario: en un request de solo lectura se usaría la
+            # réplica y se cachearía un usuario atrasado (p. ej. recién desactivado)
+            try:
+                user = self.user_model._default_manager.using('default').get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found')
+            data = _to_cache(user)
+            cache.add(key, data, _timeout())
+        
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        
+        if _check_revoke() and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != data['password_md5']:
+            raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+        
+        return user
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from apps.users.revocation import PRUNE_BATCH_SIZE, prune_expired_tokens, revoked_tokens
+
+
+class Command(BaseCommand):
+    help = 'Elimina en lotes los tokens JWT expirados y sus entradas en la lista negra'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=PRUNE_BATCH_SIZE, help='Tokens eliminados por sentencia DELETE')
+    
+    def handle(self, *args, **options):
+        deleted = prune_expired_tokens(batch_size=options['batch_size'])
+        if deleted:
+            revoked_tokens.invalidate()
+        self.stdout.write(self.style.SUCCESS(f'Eliminados {deleted} tokens expirados'))
@@ -0,0 +1,211 @@
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+GENERATION_KEY = 'users:revoked:generation'
+# Cada cuánto el hilo de fondo incorpora las revocaciones nuevas al filtro
+REFRESH_INTERVAL = 5
+# Las revocaciones recientes viven en la caché hasta que el filtro las incorpora
+RECENT_TTL = REFRESH_INTERVAL * 6
+FALSE_POSITIVE_RATE = 0.001
+PRUNE_BATCH_SIZE = 5000
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Filtro de Bloom simple: sin falsos negativos, falsos positivos acotados."""
+    
+    def __init__(self, capacity, error_rate=FALSE_POSITIVE_RATE):
+        self.capacity = max(capacity, 1000)
+        self.count = 0
+        self.size = int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.hashes = max(1, int(round(self.size / self.capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+    
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'big')
+        second = int.from_bytes(digest[8:], 'big') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+    
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+    
+    @property
+    def full(self):
+        return self.count > self.capacity
+    
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class RevokedTokenFilter:
+    """
+    Filtro en memoria de los JTI revocados, por proceso. Un JTI ausente del
+    filtro no está en la lista negra y se evita la consulta; uno presente se
+    confirma contra la base de datos, que sigue siendo la fuente de verdad.
+    
+    Un hilo de fondo mantiene el filtro fuera del camino del request: cada
+    REFRESH_INTERVAL segundos agrega las filas de la lista negra con id mayor
+    al último visto y lee la generación una sola vez. La lectura completa de
+    la lista negra solo se repite al arrancar, cuando prune_tokens incrementa
+    la generación o cuando el filtro supera su capacidad. Mientras no hay
+    filtro se consulta la lista negra como sin él.
+    
+    Lo revocado desde la última pasada (en este u otro worker, o en una
+    transacción que confirmó con un id menor) se cubre con una clave por JTI
+    en la caché compartida, la única consulta extra del camino común. Solo se
+    usa con una caché compartida; con caché por proceso se consulta siempre
+    la lista negra.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._generation = None
+        self._last_id = 0
+        self._pid = None
+    
+    def enabled(self):
+        from apps.performance.caching import cache_is_shared
+        
+        return cache_is_shared()
+    
+    def _ensure_started(self):
+        # Por pid: tras un fork (gunicorn con preload) el hilo del padre no existe
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._filter = None
+                    self._generation = None
+                    self._last_id = 0
+                    threading.Thread(target=self._run, name='revoked-tokens', daemon=True).start()
+                    self._pid = os.getpid()
+    
+    def _run(self):
+        while True:
+            close_old_connections()
+            try:
+                self.refresh()
+            except Exception:
+                logger.warning('Could not refresh the revoked token filter', exc_info=True)
+            finally:
+                close_old_connections()
+            time.sleep(REFRESH_INTERVAL)
+    
+    def _rows(self, queryset):
+        return queryset.order_by('id').values_list('id', 'token__jti').iterator(chunk_size=PRUNE_BATCH_SIZE)
+    
+    def _build(self):
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+        
+        # El id se fija antes de leer: lo insertado después entra en la pasada siguiente
+        last_id = BlacklistedToken.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        jtis = [
+            jti for _, jti in self._rows(
+                BlacklistedToken.objects.filter(id__lte=last_id, token__expires_at__gt=timezone.now())
+            )
+        ]
+        bloom = BloomFilter(len(jtis) * 2)
+        for jti in jtis:
+            bloom.add(jti)
+        return bloom, last_id
+    
+    def refresh(self):
+        """Una pasada del hilo de fondo: reconstruye o agrega lo nuevo."""
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+        
+        generation = cache.get_or_set(GENERATION_KEY, 1, None)
+        bloom = self._filter
+        if bloom is None or bloom.full or generation != self._generation:
+            bloom, last_id = self._build()
+        else:
+            last_id = self._last_id
+            for row_id, jti in self._rows(BlacklistedToken.objects.filter(id__gt=last_id)):
+                bloom.add(jti)
+                last_id = row_id
+        self._filter, self._generation, self._last_id = bloom, generation, last_id
+    
+    def might_be_revoked(self, jti):
+        self._ensure_started()
+        bloom = self._filter
+        if bloom is None:
+            return True
+        return jti in bloom or cache.get(_recent_key(jti)) is not None
+    
+    def revoked(self, jti):
+        bloom = self._filter
+        if bloom is not None:
+            bloom.add(jti)
+        cache.set(_recent_key(jti), 1, RECENT_TTL)
+    
+    def invalidate(self):
+        """Fuerza la reconstrucción en todos los procesos (tras prune_tokens)."""
+        if not cache.add(GENERATION_KEY, 2, None):
+            try:
+                cache.incr(GENERATION_KEY)
+            except ValueError:
+                cache.set(GENERATION_KEY, 2, None)
+
+
+def _recent_key(jti):
+    return f'users:revoked:{jti}'
+
+
+revoked_tokens = RevokedTokenFilter()
+
+
+class FilteredRefreshToken(RefreshToken):
+    """RefreshToken que consulta el filtro de revocados antes que la lista negra."""
+    
+    def check_blacklist(self):
+        if not revoked_tokens.enabled():
+            return super().check_blacklist()
+        
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+        
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if not revoked_tokens.might_be_revoked(jti):
+            return
+        if BlacklistedToken.objects.filter(token__jti=jti).exists():
+            raise TokenError(_('Token is blacklisted'))
+    
+    def blacklist(self):
+        result = super().blacklist()
+        if revoked_tokens.enabled():
+            revoked_tokens.revoked(self.payload[api_settings.JTI_CLAIM])
+        return result
+
+
+def prune_expired_tokens(batch_size=PRUNE_BATCH_SIZE):
+    """
+    Elimina en lotes los tokens expirados (y en cascada su entrada en la lista
+    negra) para no bloquear las tablas con un único DELETE grande.
+    """
+    from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+    
+    now = timezone.now()
+    deleted = 0
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=now).order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        deleted += OutstandingToken.objects.filter(id__in=ids).delete()[1].get(OutstandingToken._meta.label, 0)
+    return deleted
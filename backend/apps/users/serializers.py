@@ -36,7 +36,7 @@ class ChangePasswordSerializer(serializers.Serializer):
     new_password = serializers.CharField(required=True, validators=[validate_password])
     
     def validate_old_password(self, value):
-        user = self.context['request'].user
+        user = self.context.get('user') or self.context['request'].user
         if not user.check_password(value):
             raise serializers.ValidationError('La contraseña actual es incorrecta.')
         return value
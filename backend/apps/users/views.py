@@ -2,11 +2,13 @@ from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.views import APIView
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
 
 from .serializers import UserSerializer, RegisterSerializer, ChangePasswordSerializer
+from .revocation import FilteredRefreshToken
 
 User = get_user_model()
 
@@ -32,11 +34,22 @@ class RegisterView(generics.CreateAPIView):
         }, status=status.HTTP_201_CREATED)
 
 
+def fresh_user(request):
+    """
+    Usuario leído del primario. ``request.user`` puede venir de la caché de
+    autenticación y guardarlo sobrescribiría cambios hechos en otro request
+    (p. ej. restaurar la contraseña anterior).
+    """
+    return User.objects.using('default').get(pk=request.user.pk)
+
+
 class ProfileView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
     
     def get_object(self):
+        if self.request.method in ('PUT', 'PATCH'):
+            return fresh_user(self.request)
         return self.request.user
 
 
@@ -45,15 +58,15 @@ class ChangePasswordView(generics.UpdateAPIView):
     permission_classes = [IsAuthenticated]
     
     def get_object(self):
-        return self.request.user
+        return fresh_user(self.request)
     
     def update(self, request, *args, **kwargs):
-        serializer = self.get_serializer(data=request.data)
+        user = self.get_object()
+        serializer = self.get_serializer(data=request.data, context={**self.get_serializer_context(), 'user': user})
         serializer.is_valid(raise_exception=True)
         
-        user = self.get_object()
         user.set_password(serializer.validated_data['new_password'])
-        user.save()
+        user.save(update_fields=['password'])
         
         return Response({'message': 'Contraseña actualizada correctamente.'})
 
@@ -65,8 +78,17 @@ class LogoutView(APIView):
         try:
             refresh_token = request.data.get('refresh')
             if refresh_token:
-                token = RefreshToken(refresh_token)
+                token = FilteredRefreshToken(refresh_token)
                 token.blacklist()
             return Response({'message': 'Sesión cerrada correctamente.'})
         except Exception:
             return Response({'message': 'Sesión cerrada correctamente.'})
+
+
+class FilteredTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = FilteredRefreshToken
+
+
+class FilteredTokenRefreshView(TokenRefreshView):
+    serializer_class = FilteredTokenRefreshSerializer
+
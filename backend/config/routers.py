@@ -0,0 +1,57 @@
+"""
+Router de réplica de lectura.
+
+Las lecturas se envían a la réplica solo cuando ReplicaRoutingMiddleware marcó
+el request como de solo lectura (reportes, list/retrieve, summary y
+statistics). Cualquier escritura dentro del request lo fija al primario
+("sticky primary") para que las lecturas posteriores vean sus propios cambios.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_use_replica = ContextVar('use_replica', default=False)
+_pinned_to_primary = ContextVar('pinned_to_primary', default=False)
+
+
+def replica_alias():
+    alias = getattr(settings, 'DATABASE_REPLICA_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+@contextmanager
+def read_only_request(enabled=True):
+    use_token = _use_replica.set(enabled)
+    pinned_token = _pinned_to_primary.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(use_token)
+        _pinned_to_primary.reset(pinned_token)
+
+
+def route_reads_to_replica():
+    _use_replica.set(True)
+
+
+def pin_to_primary():
+    _pinned_to_primary.set(True)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and not _pinned_to_primary.get():
+            return replica_alias() or DEFAULT_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+    
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+    
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+    
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -21,6 +21,7 @@ INSTALLED_APPS = [
     # Third party
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'django_filters',
     'drf_spectacular',
@@ -35,17 +36,26 @@ INSTALLED_APPS = [
     'apps.bets',
     'apps.reports',
     'apps.goals',
+    'apps.performance',
 ]
 
+# La instrumentación va dentro de la compresión (mide el tamaño sin
+# comprimir) y fuera del presupuesto de logs (su línea nunca se descarta)
 MIDDLEWARE = [
+    'apps.performance.middleware.MetricsMiddleware',
+    'apps.performance.compression.CompressionMiddleware',
+    'apps.performance.instrumentation.InstrumentationMiddleware',
+    'apps.performance.logs.LogBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.performance.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.performance.middleware.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -67,6 +77,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
 
 DATABASES = {
     'default': {
@@ -76,9 +87,53 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default='finance_pass'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        # Conexiones persistentes: segundos que se reutiliza una conexión (0 = una por request)
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
     }
 }
 
+# Para agrupar conexiones use pgbouncer en modo transacción apuntando DB_HOST y
+# DB_PORT a él; en ese modo los cursores del lado del servidor no sobreviven
+# entre transacciones y deben desactivarse
+DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = config('DB_DISABLE_SERVER_SIDE_CURSORS', default=False, cast=bool)
+
+# Réplica de lectura opcional para reportes y listados (ver config/routers.py)
+DATABASE_REPLICA_ALIAS = 'replica'
+if config('DB_REPLICA_HOST', default=''):
+    DATABASES[DATABASE_REPLICA_ALIAS] = {
+        **DATABASES['default'],
+        'NAME': config('DB_REPLICA_NAME', default=DATABASES['default']['NAME']),
+        'USER': config('DB_REPLICA_USER', default=DATABASES['default']['USER']),
+        'PASSWORD': config('DB_REPLICA_PASSWORD', default=DATABASES['default']['PASSWORD']),
+        'HOST': config('DB_REPLICA_HOST'),
+        'PORT': config('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['config.routers.ReplicaRouter']
+
+# Caché compartida entre procesos. Con varios workers de gunicorn es
+# obligatoria: la invalidación de categorías, usuarios autenticados y tokens
+# revocados solo alcanza a los demás procesos a través de Redis. Sin REDIS_URL
+# se usa una caché en memoria por proceso (desarrollo con runserver).
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'finanzas',
+            'TIMEOUT': 300,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -103,7 +158,7 @@ AUTH_USER_MODEL = 'users.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -116,6 +171,64 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.performance.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# Compresión de respuestas (brotli si está instalado, si no gzip)
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)
+COMPRESSION_GZIP_LEVEL = config('COMPRESSION_GZIP_LEVEL', default=6, cast=int)
+COMPRESSION_BROTLI_QUALITY = config('COMPRESSION_BROTLI_QUALITY', default=4, cast=int)
+
+# Instrumentación por request (Server-Timing y log): fracción de requests medidos
+PERF_SAMPLE_RATE = config('PERF_SAMPLE_RATE', default=1.0 if DEBUG else 0.05, cast=float)
+PERF_DUPLICATE_THRESHOLD = config('PERF_DUPLICATE_THRESHOLD', default=5, cast=int)
+
+# /metrics (Prometheus); con varios workers definir PROMETHEUS_MULTIPROC_DIR
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Perfilado con cProfile: muestra de requests, guardados si superan el umbral
+PROFILE_SAMPLE_RATE = config('PROFILE_SAMPLE_RATE', default=0.0, cast=float)
+PROFILE_THRESHOLD_MS = config('PROFILE_THRESHOLD_MS', default=1000, cast=int)
+PROFILE_DIR = config('PROFILE_DIR', default=str(BASE_DIR / 'profiles'))
+PROFILE_MAX_FILES = config('PROFILE_MAX_FILES', default=50, cast=int)
+
+# Logging: formato texto o JSON, presupuesto de registros DEBUG/INFO por request
+# y muestreo de los mensajes por fila dentro de bucles
+LOG_LEVEL = config('LOG_LEVEL', default='INFO')
+LOG_FORMAT = config('LOG_FORMAT', default='text')
+LOG_REQUEST_BUDGET = config('LOG_REQUEST_BUDGET', default=200, cast=int)
+LOG_ROW_SAMPLE_FIRST = config('LOG_ROW_SAMPLE_FIRST', default=5, cast=int)
+LOG_ROW_SAMPLE_EVERY = config('LOG_ROW_SAMPLE_EVERY', default=100, cast=int)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'request_budget': {'()': 'apps.performance.logs.LogBudgetFilter'},
+    },
+    'formatters': {
+        'text': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+        'json': {'()': 'apps.performance.logs.JSONFormatter'},
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': LOG_FORMAT,
+            'filters': ['request_budget'],
+        },
+    },
+    'root': {
+        'handlers': ['console'],
+        'level': 'WARNING',
+    },
+    'loggers': {
+        'apps': {'level': LOG_LEVEL},
+        'django': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+        'django.db.backends': {'level': 'WARNING'},
+    },
 }
 
 SIMPLE_JWT = {
@@ -126,6 +239,9 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Segundos que se cachea el usuario autenticado por JWT (solo con caché compartida, REDIS_URL)
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=300, cast=int)
+
 CORS_ALLOWED_ORIGINS = config(
     'CORS_ALLOWED_ORIGINS',
     default='http://localhost:3000,http://127.0.0.1:3000',
@@ -133,6 +249,15 @@ CORS_ALLOWED_ORIGINS = config(
 )
 CORS_ALLOW_CREDENTIALS = True
 
+# Esquema OpenAPI precalculado (manage.py build_schema); APP_VERSION identifica
+# la versión del código para compartir el esquema generado por caché
+SCHEMA_DIR = config('SCHEMA_DIR', default=str(BASE_DIR / 'schema'))
+APP_VERSION = config('APP_VERSION', default='')
+
+# Hilos por proceso (cada uno con su conexión persistente) para calcular en
+# paralelo las secciones del dashboard; 1 las calcula en el hilo del request
+REPORT_SECTION_WORKERS = config('REPORT_SECTION_WORKERS', default=4, cast=int)
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'API Finanzas Personales',
     'DESCRIPTION': 'API REST para gestión de finanzas personales',
@@ -1,8 +1,13 @@
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from drf_spectacular.views import SpectacularSwaggerView
+
+from apps.performance.schema import schema_view
+from apps.performance.views import metrics_view, profile_download, profile_list
 
 urlpatterns = [
+    path('admin/profiles/', admin.site.admin_view(profile_list), name='profile-list'),
+    path('admin/profiles/<str:name>', admin.site.admin_view(profile_download), name='profile-download'),
     path('admin/', admin.site.urls),
     path('api/auth/', include('apps.users.urls')),
     path('api/accounts/', include('apps.accounts.urls')),
@@ -14,6 +19,7 @@ urlpatterns = [
     path('api/bets/', include('apps.bets.urls')),
     path('api/reports/', include('apps.reports.urls')),
     path('api/goals/', include('apps.goals.urls')),
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
+    path('api/schema/', schema_view, name='schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+    path('metrics', metrics_view, name='metrics'),
 ]
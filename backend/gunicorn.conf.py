@@ -0,0 +1,92 @@
+"""
+Configuración de gunicorn para producción.
+
+Todos los valores se pueden ajustar con variables de entorno. Por defecto usa
+workers ``gthread`` (WSGI); para servir ``config.asgi:application`` use
+``GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker``.
+
+Recarga sin cortar conexiones: ``kill -HUP <pid del master>``.
+
+Con más de un worker la caché debe ser compartida (``REDIS_URL``).
+
+Presupuesto de conexiones a Postgres por instancia: cada hilo de cada worker
+mantiene su conexión (``DB_CONN_MAX_AGE``) y cada worker además un pool de
+``REPORT_SECTION_WORKERS`` hilos para el dashboard y el hilo que mantiene el
+filtro de tokens revocados, es decir
+``workers × (threads + REPORT_SECTION_WORKERS + 1)``. Ese total, por el número de
+instancias, debe quedar por debajo de ``max_connections`` (100 por defecto en
+Postgres) dejando margen para migraciones y administración.
+"""
+import math
+import os
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def available_cpus():
+    """CPUs utilizables: respeta la afinidad y el límite de CPU del cgroup (contenedores)."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as fh:
+            quota, period = fh.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+cpu_count = available_cpus()
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+# Por defecto conservador: los hilos de cada worker ya cubren la espera de E/S
+workers = _env_int('GUNICORN_WORKERS', min(cpu_count + 1, 4))
+threads = _env_int('GUNICORN_THREADS', 4 if worker_class == 'gthread' else 1)
+
+# Reciclar workers periódicamente para acotar el crecimiento de memoria
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 2000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 200)
+
+timeout = _env_int('GUNICORN_TIMEOUT', 60)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+backlog = _env_int('GUNICORN_BACKLOG', 2048)
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True').lower() in ('1', 'true', 'yes')
+reload = os.environ.get('GUNICORN_RELOAD', 'False').lower() in ('1', 'true', 'yes')
+
+# /dev/shm evita bloqueos del heartbeat en contenedores con disco lento
+worker_tmp_dir = os.environ.get('GUNICORN_WORKER_TMP_DIR', '/dev/shm' if os.path.isdir('/dev/shm') else None)
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = os.environ.get('GUNICORN_ERROR_LOG', '-')
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+forwarded_allow_ips = os.environ.get('FORWARDED_ALLOW_IPS', '127.0.0.1')
+
+
+def on_starting(server):
+    connections = workers * (threads + _env_int('REPORT_SECTION_WORKERS', 4) + 1)
+    limit = _env_int('DB_MAX_CONNECTIONS', 100)
+    if connections > limit * 0.8:
+        server.log.warning(
+            'Hasta %d conexiones a Postgres (%d workers × (%d hilos + pool del dashboard + filtro de tokens)) '
+            'con max_connections=%d; reduzca GUNICORN_WORKERS/GUNICORN_THREADS',
+            connections, workers, threads, limit,
+        )
+    if workers > 1 and not os.environ.get('REDIS_URL'):
+        server.log.warning('%d workers sin REDIS_URL: las invalidaciones de caché no se comparten entre procesos', workers)
+    
+    # Métricas multiproceso (/metrics): descartar archivos de ejecuciones anteriores
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for filename in os.listdir(directory):
+            if filename.startswith('metrics_'):
+                os.remove(os.path.join(directory, filename))